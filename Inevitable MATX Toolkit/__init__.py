@@ -23,6 +23,7 @@ from bpy.props import (
     FloatProperty,
     FloatVectorProperty,
     PointerProperty,
+    CollectionProperty,
 )
 from bpy.types import Operator, PropertyGroup, Panel
 
@@ -40,8 +41,6 @@ addon_dir = os.path.dirname(os.path.realpath(__file__))
 if addon_dir not in sys.path:
     sys.path.append(addon_dir)
 
-from . import matx_importer
-from . import matx_exporter
 from . import rigidbody_visualizer
 
 #=========================================================================  
@@ -139,11 +138,68 @@ class RigidBodyDOFProperties(PropertyGroup):
 
 #=========================================================================
 
+_DOF_TRANSLATE = (
+    ("Translate X", 0),
+    ("Translate Y", 1),
+    ("Translate Z", 2),
+)
+
+_DOF_ROTATE = (
+    ("Rotate X", 3),
+    ("Rotate Y", 4),
+    ("Rotate Z", 5),
+)
+
+_DOF_COUNT = len(_DOF_TRANSLATE) + len(_DOF_ROTATE)
+
+# Per object DOF groups written by older versions of the addon, same order as dofs
+_LEGACY_DOF_KEYS = ("tx_dof", "ty_dof", "tz_dof", "rx_dof", "ry_dof", "rz_dof")
+
+def ensure_rigid_body_dofs(obj):
+    rb = obj.matx_rigid_body
+    while len(rb.dofs) < _DOF_COUNT:
+        dof = rb.dofs.add()
+        
+        # Carry over values from the old per object properties where the file still has them
+        legacy = obj.get(_LEGACY_DOF_KEYS[len(rb.dofs) - 1])
+        if legacy is not None and hasattr(legacy, "get"):
+            dof.active = bool(legacy.get("active", False))
+            dof.limited = bool(legacy.get("limited", False))
+            dof.min = float(legacy.get("min", 0.0))
+            dof.max = float(legacy.get("max", 0.0))
+    
+    for key in _LEGACY_DOF_KEYS:
+        if key in obj:
+            del obj[key]
+
+#=========================================================================
+
+def migrate_rigid_body_dofs():
+    for obj in bpy.data.objects:
+        rb = obj.matx_rigid_body
+        if len(rb.dofs) < _DOF_COUNT and (rb.enabled or any(key in obj for key in _LEGACY_DOF_KEYS)):
+            ensure_rigid_body_dofs(obj)
+
+#=========================================================================
+
+@bpy.app.handlers.persistent
+def on_file_load_migrate_dofs(dummy):
+    migrate_rigid_body_dofs()
+
+#=========================================================================
+
+def update_rigid_body_enabled(self, context):
+    if self.enabled:
+        ensure_rigid_body_dofs(self.id_data)
+
+#=========================================================================
+
 class RigidBodyProperties(PropertyGroup):
     enabled: BoolProperty(
         name="Enabled",
         description="Enable rigid body for this object",
-        default=False
+        default=False,
+        update=update_rigid_body_enabled
     )
     
     rb_type: EnumProperty(
@@ -236,6 +292,31 @@ class RigidBodyProperties(PropertyGroup):
         default=(1.0, 1.0, 1.0),
         subtype='XYZ'
     )
+    
+    # Degrees of freedom: TX, TY, TZ, RX, RY, RZ
+    dofs: CollectionProperty(
+        name="Degrees of Freedom",
+        type=RigidBodyDOFProperties
+    )
+    
+    # Panel section visibility
+    show_body_transform: BoolProperty(
+        name="Show Body Transform",
+        description="Expand the body transform section",
+        default=True
+    )
+    
+    show_pivot_transform: BoolProperty(
+        name="Show Pivot Transform",
+        description="Expand the pivot transform section",
+        default=True
+    )
+    
+    show_dof: BoolProperty(
+        name="Show Degrees of Freedom",
+        description="Expand the degrees of freedom section",
+        default=True
+    )
 
 #=========================================================================
 #==-------------------------------------
@@ -270,6 +351,22 @@ class MATX_PT_material_settings(Panel):
 
 #=========================================================================
 
+class MATX_OT_init_rigid_body_dofs(Operator):
+    bl_idname = "matx.init_rigid_body_dofs"
+    bl_label = "Initialize Degrees of Freedom"
+    bl_description = "Create the degrees of freedom entries of this rigid body"
+    bl_options = {'REGISTER', 'UNDO'}
+    
+    @classmethod
+    def poll(cls, context):
+        return context.object is not None and hasattr(context.object, 'matx_rigid_body')
+    
+    def execute(self, context):
+        ensure_rigid_body_dofs(context.object)
+        return {'FINISHED'}
+
+#=========================================================================
+
 class MATX_PT_RigidBodyPanel(Panel):
     bl_label = "MATX Rigid Body"
     bl_idname = "MATX_PT_RigidBodyPanel"
@@ -279,7 +376,8 @@ class MATX_PT_RigidBodyPanel(Panel):
     
     @classmethod
     def poll(cls, context):
-        return context.object and context.object.type == 'MESH'
+        obj = context.object
+        return obj and obj.type == 'MESH' and context.mode in {'OBJECT', 'POSE'}
     
     def draw(self, context):
         layout = self.layout
@@ -296,11 +394,7 @@ class MATX_PT_RigidBodyPanel(Panel):
         box.prop(rb, "rb_type")
         box.prop(rb, "mass")
 
-        has_vis = False
-        for vis_obj in bpy.data.objects:
-            if "matx_rb_visualization" in vis_obj and vis_obj.get("matx_rb_parent") == obj.name:
-                has_vis = True
-                break       
+        has_vis = rigidbody_visualizer.get_visualization_object(obj) is not None
         
         if has_vis:
             box.operator("matx.remove_rigidbody_visualization", icon='X')
@@ -324,48 +418,62 @@ class MATX_PT_RigidBodyPanel(Panel):
             box.operator("matx.fit_rigidbody_to_mesh", icon='FULLSCREEN_ENTER')    
         
         box = layout.box()
-        box.label(text="Body Transform")
+        box.prop(rb, "show_body_transform", text="Body Transform",
+                 icon='TRIA_DOWN' if rb.show_body_transform else 'TRIA_RIGHT', emboss=False)
         
-        # Body Position
-        pos_row = box.column(align=True)
-        pos_row.prop(rb, "body_position", text="X", index=0)
-        pos_row.prop(rb, "body_position", text="Y", index=1)
-        pos_row.prop(rb, "body_position", text="Z", index=2)
+        if rb.show_body_transform:
+            # Body Position
+            pos_row = box.column(align=True)
+            pos_row.prop(rb, "body_position", text="X", index=0)
+            pos_row.prop(rb, "body_position", text="Y", index=1)
+            pos_row.prop(rb, "body_position", text="Z", index=2)
         
-        # Body Rotation
-        box.label(text="Rotation:")
-        col = box.column(align=True)
-        col.prop(rb, "body_rotation", text="W", index=0)
-        col.prop(rb, "body_rotation", text="X", index=1)
-        col.prop(rb, "body_rotation", text="Y", index=2)
-        col.prop(rb, "body_rotation", text="Z", index=3)
+            # Body Rotation
+            box.label(text="Rotation:")
+            col = box.column(align=True)
+            col.prop(rb, "body_rotation", text="W", index=0)
+            col.prop(rb, "body_rotation", text="X", index=1)
+            col.prop(rb, "body_rotation", text="Y", index=2)
+            col.prop(rb, "body_rotation", text="Z", index=3)
         
-        # Body Scale
-        box.prop(rb, "body_scale")
+            # Body Scale
+            box.prop(rb, "body_scale")
         
         box = layout.box()
-        box.label(text="Pivot Transform")
+        box.prop(rb, "show_pivot_transform", text="Pivot Transform",
+                 icon='TRIA_DOWN' if rb.show_pivot_transform else 'TRIA_RIGHT', emboss=False)
         
-        # Pivot Position
-        pos_row = box.column(align=True)
-        pos_row.prop(rb, "pivot_position", text="X", index=0)
-        pos_row.prop(rb, "pivot_position", text="Y", index=1)
-        pos_row.prop(rb, "pivot_position", text="Z", index=2)
+        if rb.show_pivot_transform:
+            # Pivot Position
+            pos_row = box.column(align=True)
+            pos_row.prop(rb, "pivot_position", text="X", index=0)
+            pos_row.prop(rb, "pivot_position", text="Y", index=1)
+            pos_row.prop(rb, "pivot_position", text="Z", index=2)
         
-        # Pivot Rotation
-        box.label(text="Rotation:")
-        col = box.column(align=True)
-        col.prop(rb, "pivot_rotation", text="W", index=0)
-        col.prop(rb, "pivot_rotation", text="X", index=1)
-        col.prop(rb, "pivot_rotation", text="Y", index=2)
-        col.prop(rb, "pivot_rotation", text="Z", index=3)
+            # Pivot Rotation
+            box.label(text="Rotation:")
+            col = box.column(align=True)
+            col.prop(rb, "pivot_rotation", text="W", index=0)
+            col.prop(rb, "pivot_rotation", text="X", index=1)
+            col.prop(rb, "pivot_rotation", text="Y", index=2)
+            col.prop(rb, "pivot_rotation", text="Z", index=3)
         
-        # Pivot Scale
-        box.prop(rb, "pivot_scale")        
+            # Pivot Scale
+            box.prop(rb, "pivot_scale")
         
         # Degrees of Freedom UI
         box = layout.box()
-        box.label(text="Degrees of Freedom")
+        box.prop(rb, "show_dof", text="Degrees of Freedom",
+                 icon='TRIA_DOWN' if rb.show_dof else 'TRIA_RIGHT', emboss=False)
+        
+        if not rb.show_dof:
+            return
+        
+        if len(rb.dofs) < _DOF_COUNT:
+            # Panels cannot write ID data, so missing entries are created by an operator
+            box.label(text="Degrees of freedom are not initialized", icon='INFO')
+            box.operator(MATX_OT_init_rigid_body_dofs.bl_idname, icon='ADD')
+            return
         
         col = box.column(align=True)
         
@@ -378,52 +486,51 @@ class MATX_PT_RigidBodyPanel(Panel):
         
         col.separator()
         
-        dofs = [
-            {"name": "Translate X", "prop": obj.tx_dof},
-            {"name": "Translate Y", "prop": obj.ty_dof},
-            {"name": "Translate Z", "prop": obj.tz_dof},
-            {"name": "Rotate X", "prop": obj.rx_dof},
-            {"name": "Rotate Y", "prop": obj.ry_dof},
-            {"name": "Rotate Z", "prop": obj.rz_dof}
-        ]
-        
         col.label(text="Translation")
-        for dof in dofs[:3]:
+        for label, dof_idx in _DOF_TRANSLATE:
+            dof = rb.dofs[dof_idx]
+            active = dof.active
+            limited = active and dof.limited
+            
             row = col.row(align=True)
-            row.label(text=dof["name"])
-            row.prop(dof["prop"], "active", text="")
+            row.label(text=label)
+            row.prop(dof, "active", text="")
             
             limited_row = row.row()
-            limited_row.prop(dof["prop"], "limited", text="")
-            limited_row.enabled = dof["prop"].active
+            limited_row.prop(dof, "limited", text="")
+            limited_row.enabled = active
             
             min_row = row.row()
-            min_row.prop(dof["prop"], "min", text="")
-            min_row.enabled = dof["prop"].active and dof["prop"].limited
+            min_row.prop(dof, "min", text="")
+            min_row.enabled = limited
             
             max_row = row.row()
-            max_row.prop(dof["prop"], "max", text="")
-            max_row.enabled = dof["prop"].active and dof["prop"].limited
+            max_row.prop(dof, "max", text="")
+            max_row.enabled = limited
         
         col.separator()
         
         col.label(text="Rotation")
-        for dof in dofs[3:]:
+        for label, dof_idx in _DOF_ROTATE:
+            dof = rb.dofs[dof_idx]
+            active = dof.active
+            limited = active and dof.limited
+            
             row = col.row(align=True)
-            row.label(text=dof["name"])
-            row.prop(dof["prop"], "active", text="")
+            row.label(text=label)
+            row.prop(dof, "active", text="")
             
             limited_row = row.row()
-            limited_row.prop(dof["prop"], "limited", text="")
-            limited_row.enabled = dof["prop"].active
+            limited_row.prop(dof, "limited", text="")
+            limited_row.enabled = active
             
             min_row = row.row()
-            min_row.prop(dof["prop"], "min", text="")
-            min_row.enabled = dof["prop"].active and dof["prop"].limited
+            min_row.prop(dof, "min", text="")
+            min_row.enabled = limited
             
             max_row = row.row()
-            max_row.prop(dof["prop"], "max", text="")
-            max_row.enabled = dof["prop"].active and dof["prop"].limited
+            max_row.prop(dof, "max", text="")
+            max_row.enabled = limited
             
 #=========================================================================
 #==-------------------------------------
@@ -440,6 +547,7 @@ class ImportMatx(Operator, ImportHelper):
     
     def execute(self, context):
         try:
+            from . import matx_importer
             return matx_importer.parse_matx_file(self.filepath)
         except Exception as e:
             error_msg = f"Error: {str(e)}\n{traceback.format_exc()}"
@@ -457,7 +565,9 @@ class ExportMatx(Operator, ExportHelper):
     filter_glob: StringProperty(default="*.matx", options={'HIDDEN'})   
     
     def execute(self, context):
-        try:           
+        try:
+            from . import matx_exporter
+            rigidbody_visualizer.exclude_visualizations_from_export()
             return matx_exporter.export_matx_file(
                 self.filepath, 
                 context
@@ -493,16 +603,15 @@ def register():
     bpy.utils.register_class(RigidBodyDOFProperties)
     bpy.utils.register_class(RigidBodyProperties)    
     bpy.types.Object.matx_rigid_body = PointerProperty(type=RigidBodyProperties)
-    bpy.types.Object.tx_dof = PointerProperty(type=RigidBodyDOFProperties)
-    bpy.types.Object.ty_dof = PointerProperty(type=RigidBodyDOFProperties)
-    bpy.types.Object.tz_dof = PointerProperty(type=RigidBodyDOFProperties)
-    bpy.types.Object.rx_dof = PointerProperty(type=RigidBodyDOFProperties)
-    bpy.types.Object.ry_dof = PointerProperty(type=RigidBodyDOFProperties)
-    bpy.types.Object.rz_dof = PointerProperty(type=RigidBodyDOFProperties)
     
+    bpy.utils.register_class(MATX_OT_init_rigid_body_dofs)
     bpy.utils.register_class(MATX_PT_material_settings)
     bpy.utils.register_class(MATX_PT_RigidBodyPanel)
     
+    # load_post does not run for the file that is open while the addon is enabled
+    bpy.app.handlers.load_post.append(on_file_load_migrate_dofs)
+    bpy.app.timers.register(migrate_rigid_body_dofs, first_interval=0.0)
+    
     bpy.utils.register_class(ImportMatx)
     bpy.utils.register_class(ExportMatx)
     bpy.types.TOPBAR_MT_file_import.append(menu_func_import)
@@ -513,16 +622,17 @@ def register():
 def unregister():
     rigidbody_visualizer.unregister()
     
+    if on_file_load_migrate_dofs in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.remove(on_file_load_migrate_dofs)
+    
+    if bpy.app.timers.is_registered(migrate_rigid_body_dofs):
+        bpy.app.timers.unregister(migrate_rigid_body_dofs)
+    
     bpy.utils.unregister_class(MATX_PT_RigidBodyPanel)
     bpy.utils.unregister_class(MATX_PT_material_settings)
+    bpy.utils.unregister_class(MATX_OT_init_rigid_body_dofs)
     
     del bpy.types.Object.matx_rigid_body
-    del bpy.types.Object.tx_dof
-    del bpy.types.Object.ty_dof
-    del bpy.types.Object.tz_dof
-    del bpy.types.Object.rx_dof
-    del bpy.types.Object.ry_dof
-    del bpy.types.Object.rz_dof
     del bpy.types.Material.matx_settings
     
     bpy.utils.unregister_class(RigidBodyProperties)
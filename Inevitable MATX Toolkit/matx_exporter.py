@@ -13,9 +13,38 @@ import getpass
 import socket
 import mathutils
 import traceback
-from mathutils import Vector, Matrix
+import numpy as np
+from mathutils import Matrix
 from textout import TextWriter, TextType
 
+# Blender (X, Y, Z) -> MATX (X, Z, -Y)
+_AXIS_SWAP = Matrix((
+    (1.0, 0.0,  0.0, 0.0),
+    (0.0, 0.0,  1.0, 0.0),
+    (0.0, -1.0, 0.0, 0.0),
+    (0.0, 0.0,  0.0, 1.0),
+))
+_AXIS_SWAP_INV = _AXIS_SWAP.transposed()
+_AXIS_SWAP_NP = np.array(_AXIS_SWAP, dtype=np.float64)
+
+_RB_FORMAT_STR = (
+    "Index:d Name:s Type:s Mass:f iParent:d "
+    "Body_Scale:fff Body_Rotate:ffff Body_Pos:fff "
+    "Pivot_Scale:fff Pivot_Rotate:ffff Pivot_Pos:fff "
+    "Radius:f Width:f Height:f Length:f "
+    "TX_Act:d TX_Lim:d TX_Min:f TX_Max:f "
+    "TY_Act:d TY_Lim:d TY_Min:f TY_Max:f "
+    "TZ_Act:d TZ_Lim:d TZ_Min:f TZ_Max:f "
+    "RX_Act:d RX_Lim:d RX_Min:f RX_Max:f "
+    "RY_Act:d RY_Lim:d RY_Min:f RY_Max:f "
+    "RZ_Act:d RZ_Lim:d RZ_Min:f RZ_Max:f"
+)
+_RB_DOF_AXES = ("TX", "TY", "TZ", "RX", "RY", "RZ")
+_RB_DOF_DEFAULT = (False, False, 0.0, 0.0)
+
+_USER_NAME = getpass.getuser()
+_COMPUTER_NAME = socket.gethostname()
+
 #=============================================================================
 
 def report(level, message):
@@ -23,7 +52,7 @@ def report(level, message):
 
 #=============================================================================
 
-def write_file_header(writer, filepath, mesh_objects, armature_objects=None):
+def write_file_header(writer, filepath, mesh_objects, material_data, armature_objects=None):
     report('INFO', "Writing file header metadata")
     
     writer.add_header("MatxVersion")
@@ -38,52 +67,45 @@ def write_file_header(writer, filepath, mesh_objects, armature_objects=None):
     writer.add_end_line()
     
     writer.add_header("UserInfo")
-    writer.add_field("UserName:s ComputerName:s", getpass.getuser(), socket.gethostname())
+    writer.add_field("UserName:s ComputerName:s", _USER_NAME, _COMPUTER_NAME)
     writer.add_end_line()
     
     armature_objects = armature_objects or []
     
-    writer.fp.write("//===================================================================================\n")
-    writer.fp.write("//\n")
-    writer.fp.write(f"// File: {filepath}\n")
-    writer.fp.write("//\n")
-    
     total_bones = sum(len(arm.data.bones) for arm in armature_objects) if armature_objects else 1
-    total_vertices = sum(len(obj.data.vertices) for obj in mesh_objects)
-    total_polygons = sum(len(obj.data.polygons) for obj in mesh_objects)
-    
-    total_materials = 0
-    total_textures = 0
-    materials_set = set()
+    total_vertices = 0
+    total_polygons = 0
     
     for obj in mesh_objects:
-        for mat_slot in obj.material_slots:
-            if mat_slot.material and mat_slot.material not in materials_set:
-                materials_set.add(mat_slot.material)
-                total_materials += 1
-                
-                if hasattr(mat_slot.material, 'node_tree') and mat_slot.material.node_tree:
-                    for node in mat_slot.material.node_tree.nodes:
-                        if node.type == 'TEX_IMAGE' and node.image:
-                            total_textures += 1
+        mesh = obj.data
+        total_vertices += len(mesh.vertices)
+        total_polygons += len(mesh.polygons)
+    
+    total_materials = len(material_data["materials"])
+    total_textures = len(material_data["textures"])
     
     report('INFO', f"Geometry statistics: {total_bones} bones, {total_vertices} vertices, {total_polygons} polygons")
     report('INFO', f"Material statistics: {total_materials} materials, {total_textures} textures")
     
-    writer.fp.write(f"// Geometry information\n")
-    writer.fp.write(f"//   Bones:{total_bones}\n")
-    writer.fp.write(f"//   Vertices:{total_vertices}\n")
-    writer.fp.write(f"//   Polygons:{total_polygons}\n")
-    writer.fp.write(f"//   Textures:{total_textures}\n")
-    writer.fp.write(f"//   Materials:{total_materials}\n")
-    writer.fp.write("//\n")
-    writer.fp.write(f"// Inevitable Entertainment\n")
-    writer.fp.write(f"// Death. Taxes. Games.\n")
-    writer.fp.write("//\n")
-    writer.fp.write("//===================================================================================\n")
-    writer.fp.write("\n")
-    
-    return {"materials": list(materials_set)}
+    writer.write("\n".join([
+        "//===================================================================================",
+        "//",
+        f"// File: {filepath}",
+        "//",
+        "// Geometry information",
+        f"//   Bones:{total_bones}",
+        f"//   Vertices:{total_vertices}",
+        f"//   Polygons:{total_polygons}",
+        f"//   Textures:{total_textures}",
+        f"//   Materials:{total_materials}",
+        "//",
+        "// Inevitable Entertainment",
+        "// Death. Taxes. Games.",
+        "//",
+        "//===================================================================================",
+        "",
+        "",
+    ]))
     
 #============================================================================= 
 #==-------------------------------------
@@ -127,52 +149,45 @@ def export_hierarchy(writer, mesh_objects, armature_objects=None):
     
     report('INFO', f"Exporting hierarchical bone structure from {len(armature_objects)} armatures with total {total_bones} bones")
     
-    all_bones = []
+    bone_names = []
+    bone_children = []
+    bone_parents = []
+    bone_matrices = []
+    bone_to_idx = {}
     
     for arm_obj in armature_objects:
         if arm_obj.pose:
-            arm_world_matrix = arm_obj.matrix_world
             report('INFO', f"Processing armature '{arm_obj.name}' with {len(arm_obj.data.bones)} bones")
             
             for bone in arm_obj.data.bones:
-                parent_idx = -1
-                if bone.parent:
-                    for idx, b in enumerate(all_bones):
-                        if b.get('bone_obj') == bone.parent:
-                            parent_idx = idx
-                            break
+                bone_name = bone.name
+                parent = bone.parent
+                parent_idx = bone_to_idx.get(parent, -1) if parent else -1
                 
-                bone_idx = len(all_bones)
-                all_bones.append({
-                    'name': bone.name,
-                    'children': [],
-                    'parent_idx': parent_idx,
-                    'matrix_local': bone.matrix_local,
-                    'bone_obj': bone
-                })
+                bone_idx = len(bone_names)
+                bone_to_idx[bone] = bone_idx
+                bone_names.append(bone_name)
+                bone_children.append(0)
+                bone_parents.append(parent_idx)
+                bone_matrices.append(bone.matrix_local)
                 
                 if parent_idx >= 0:
-                    all_bones[parent_idx]['children'].append(bone_idx)
-                    report('INFO', f"  Bone '{bone.name}' (idx: {bone_idx}) has parent '{all_bones[parent_idx]['name']}' (idx: {parent_idx})")
+                    bone_children[parent_idx] += 1
+                    report('INFO', f"  Bone '{bone_name}' (idx: {bone_idx}) has parent '{bone_names[parent_idx]}' (idx: {parent_idx})")
                 else:
-                    report('INFO', f"  Bone '{bone.name}' (idx: {bone_idx}) is a root bone")
+                    report('INFO', f"  Bone '{bone_name}' (idx: {bone_idx}) is a root bone")
     
-    writer.add_header("Hierarchy", len(all_bones))
-    report('INFO', f"Writing {len(all_bones)} bones to hierarchy")
+    writer.add_header("Hierarchy", len(bone_names))
+    report('INFO', f"Writing {len(bone_names)} bones to hierarchy")
     
-    for idx, bone_data in enumerate(all_bones):
-        matrix = bone_data['matrix_local']
-        loc, rot, scale = matrix.decompose()
-        
-        pos = (loc.x, loc.z, -loc.y)
-        rot = (rot.w, rot.x, rot.z, -rot.y)
-        scale = (scale.x, scale.z, scale.y)
+    for idx in range(len(bone_names)):
+        pos, rot, scale = (_AXIS_SWAP @ bone_matrices[idx] @ _AXIS_SWAP_INV).decompose()
         
         writer.add_field("Index:d Name:s nChildren:d iParent:d Scale:fff Rotate:ffff Pos:fff LODGroup:d", 
-                        idx, bone_data['name'], len(bone_data['children']), bone_data['parent_idx'], 
-                        scale[0], scale[1], scale[2],
-                        rot[0], rot[1], rot[2], rot[3],
-                        pos[0], pos[1], pos[2],
+                        idx, bone_names[idx], bone_children[idx], bone_parents[idx], 
+                        scale.x, scale.y, scale.z,
+                        rot.w, rot.x, rot.y, rot.z,
+                        pos.x, pos.y, pos.z,
                         -1)        
         writer.add_end_line()
     
@@ -181,7 +196,7 @@ def export_hierarchy(writer, mesh_objects, armature_objects=None):
 #=============================================================================
 
 def export_rigid_bodies(writer, mesh_objects):
-    rigid_body_objects = [obj for obj in mesh_objects if hasattr(obj, 'matx_rigid_body') and obj.matx_rigid_body.enabled]
+    rigid_body_objects = [obj for obj in mesh_objects if obj.matx_rigid_body.enabled]
     
     if not rigid_body_objects:
         report('INFO', "No rigid bodies found to export")
@@ -200,58 +215,41 @@ def export_rigid_bodies(writer, mesh_objects):
         else:
             return "Sphere"
     
+    rb_index = {obj: idx for idx, obj in enumerate(rigid_body_objects)}
+    
     for idx, obj in enumerate(rigid_body_objects):
         rb = obj.matx_rigid_body
         rb_type_str = get_rb_type_string(rb.rb_type)
         
-        parent_idx = -1
-        if obj.parent and obj.parent in rigid_body_objects:
-            parent_idx = rigid_body_objects.index(obj.parent)
+        # Missing entries are written with their defaults, export never changes ID data
+        dofs = [(dof.active, dof.limited, dof.min, dof.max) for dof in rb.dofs[:len(_RB_DOF_AXES)]]
+        dofs += [_RB_DOF_DEFAULT] * (len(_RB_DOF_AXES) - len(dofs))
+        dof_values = tuple(value for active, limited, dof_min, dof_max in dofs
+                           for value in (int(active), int(limited), dof_min, dof_max))
+        
+        parent_idx = rb_index.get(obj.parent, -1) if obj.parent else -1
+        if parent_idx >= 0:
             parent_name = obj.parent.name
             report('INFO', f"  Rigid body '{obj.name}' (type: {rb_type_str}) has parent '{parent_name}' (idx: {parent_idx})")
         else:
             report('INFO', f"  Rigid body '{obj.name}' (type: {rb_type_str}) has no parent, mass: {rb.mass}")
         
         writer.add_field(
-            "Index:d Name:s Type:s Mass:f iParent:d "
-            "Body_Scale:fff Body_Rotate:ffff Body_Pos:fff "
-            "Pivot_Scale:fff Pivot_Rotate:ffff Pivot_Pos:fff "
-            "Radius:f Width:f Height:f Length:f "
-            "TX_Act:d TX_Lim:d TX_Min:f TX_Max:f "
-            "TY_Act:d TY_Lim:d TY_Min:f TY_Max:f "
-            "TZ_Act:d TZ_Lim:d TZ_Min:f TZ_Max:f "
-            "RX_Act:d RX_Lim:d RX_Min:f RX_Max:f "
-            "RY_Act:d RY_Lim:d RY_Min:f RY_Max:f "
-            "RZ_Act:d RZ_Lim:d RZ_Min:f RZ_Max:f",
+            _RB_FORMAT_STR,
             
             idx, obj.name, rb_type_str, rb.mass, parent_idx,
             
-            rb.body_scale[0], rb.body_scale[1], rb.body_scale[2],
-            rb.body_rotation[0], rb.body_rotation[1], rb.body_rotation[2], rb.body_rotation[3],
-            rb.body_position[0], rb.body_position[1], rb.body_position[2],
-            
-            rb.pivot_scale[0], rb.pivot_scale[1], rb.pivot_scale[2],
-            rb.pivot_rotation[0], rb.pivot_rotation[1], rb.pivot_rotation[2], rb.pivot_rotation[3],
-            rb.pivot_position[0], rb.pivot_position[1], rb.pivot_position[2],
+            *rb.body_scale[:], *rb.body_rotation[:], *rb.body_position[:],
+            *rb.pivot_scale[:], *rb.pivot_rotation[:], *rb.pivot_position[:],
             
             rb.radius, rb.width, rb.height, rb.length,
             
-            int(obj.tx_dof.active), int(obj.tx_dof.limited), obj.tx_dof.min, obj.tx_dof.max,
-            int(obj.ty_dof.active), int(obj.ty_dof.limited), obj.ty_dof.min, obj.ty_dof.max,
-            int(obj.tz_dof.active), int(obj.tz_dof.limited), obj.tz_dof.min, obj.tz_dof.max,
-            int(obj.rx_dof.active), int(obj.rx_dof.limited), obj.rx_dof.min, obj.rx_dof.max,
-            int(obj.ry_dof.active), int(obj.ry_dof.limited), obj.ry_dof.min, obj.ry_dof.max,
-            int(obj.rz_dof.active), int(obj.rz_dof.limited), obj.rz_dof.min, obj.rz_dof.max
+            *dof_values
         )       
         writer.add_end_line()
         
-        dof_info = []
-        if obj.tx_dof.active: dof_info.append(f"TX: {'limited' if obj.tx_dof.limited else 'free'}")
-        if obj.ty_dof.active: dof_info.append(f"TY: {'limited' if obj.ty_dof.limited else 'free'}")
-        if obj.tz_dof.active: dof_info.append(f"TZ: {'limited' if obj.tz_dof.limited else 'free'}")
-        if obj.rx_dof.active: dof_info.append(f"RX: {'limited' if obj.rx_dof.limited else 'free'}")
-        if obj.ry_dof.active: dof_info.append(f"RY: {'limited' if obj.ry_dof.limited else 'free'}")
-        if obj.rz_dof.active: dof_info.append(f"RZ: {'limited' if obj.rz_dof.limited else 'free'}")
+        dof_info = [f"{axis}: {'limited' if limited else 'free'}"
+                    for axis, (active, limited, _, _) in zip(_RB_DOF_AXES, dofs) if active]
         
         if dof_info:
             report('INFO', f"    DOF: {', '.join(dof_info)}")
@@ -260,335 +258,340 @@ def export_rigid_bodies(writer, mesh_objects):
 
 #=============================================================================
 
-def export_vertices(writer, mesh_objects):
-    total_vertices = sum(len(obj.data.vertices) for obj in mesh_objects)
-    writer.add_header("Vertices", total_vertices)
+def collect_object_matrices(mesh_objects):
+    # World and rotation-only matrices as numpy with the MATX axis swap folded in,
+    # converted once per object and shared by all sections
+    object_matrices = []
     
-    vertex_index = 0
     for obj in mesh_objects:
-        mesh = obj.data
         world_matrix = obj.matrix_world
-        
-        for vert in mesh.vertices:
-            pos = world_matrix @ vert.co
-            pos_max = Vector((pos.x, pos.z, -pos.y))
-            
-            writer.add_field("Index:d Pos:fff nNormals:d nUVSets:d nColors:d nWeights:d", 
-                            vertex_index, pos_max.x, pos_max.y, pos_max.z, 
-                            1, 1, 1, 1)
-            
-            vertex_index += 1
-            writer.add_end_line()
+        object_matrices.append((
+            _AXIS_SWAP_NP @ np.array(world_matrix, dtype=np.float64),
+            _AXIS_SWAP_NP[:3, :3] @ np.array(world_matrix.to_quaternion().to_matrix(), dtype=np.float64),
+        ))
+    
+    return object_matrices
 
 #=============================================================================
 
-def export_normals(writer, mesh_objects):
-    total_vertices = sum(len(obj.data.vertices) for obj in mesh_objects)
-    writer.add_header("Normals", total_vertices)
+def collect_skin_bones(armature_objects):
+    bone_name_to_index = {}
     
-    vertex_index = 0
-    for obj in mesh_objects:
-        mesh = obj.data
-        
-        if bpy.app.version >= (4, 1, 0):
-            pass
-        else:
-            mesh.calc_normals_split()
-        
-        world_matrix = obj.matrix_world
-        rot_matrix = world_matrix.to_quaternion().to_matrix()
-        
-        vert_to_loop_normals = {}
-        
-        for poly in mesh.polygons:
-            if not poly.use_smooth:
-                poly_normal = poly.normal
-                for vert_idx in poly.vertices:
-                    if vert_idx not in vert_to_loop_normals:
-                        vert_to_loop_normals[vert_idx] = []
-                    vert_to_loop_normals[vert_idx].append(poly_normal)
-            else:
-                for loop_idx in poly.loop_indices:
-                    loop = mesh.loops[loop_idx]
-                    vert_idx = loop.vertex_index
-                    if vert_idx not in vert_to_loop_normals:
-                        vert_to_loop_normals[vert_idx] = []
-                    vert_to_loop_normals[vert_idx].append(loop.normal)
-        
-        for vert_idx in range(len(mesh.vertices)):
-            if vert_idx in vert_to_loop_normals and vert_to_loop_normals[vert_idx]:
-                avg_normal = Vector((0, 0, 0))
-                for n in vert_to_loop_normals[vert_idx]:
-                    avg_normal += n
-                
-                if avg_normal.length > 0:
-                    avg_normal.normalize()
-                else:
-                    avg_normal = mesh.vertices[vert_idx].normal
-                
-                normal_world = rot_matrix @ avg_normal
-                normal_max = Vector((normal_world.x, normal_world.z, -normal_world.y)).normalized()
-                
-                writer.add_field("iVertex:d Index:d Normal:fff", 
-                                vertex_index, 0, normal_max.x, normal_max.y, normal_max.z)
-            else:
-                normal = mesh.vertices[vert_idx].normal
-                normal_world = rot_matrix @ normal
-                normal_max = Vector((normal_world.x, normal_world.z, -normal_world.y)).normalized()
-                
-                writer.add_field("iVertex:d Index:d Normal:fff", 
-                                vertex_index, 0, normal_max.x, normal_max.y, normal_max.z)
-            
-            vertex_index += 1
-            writer.add_end_line()
+    if not armature_objects:
+        return bone_name_to_index
+    
+    bone_index = 0
+    for arm_obj in armature_objects:
+        for bone in arm_obj.data.bones:
+            if bone.name not in bone_name_to_index:
+                bone_name_to_index[bone.name] = bone_index
+                bone_index += 1
+    
+    return bone_name_to_index
 
 #=============================================================================
 
-def export_colors(writer, mesh_objects):
-    total_vertices = sum(len(obj.data.vertices) for obj in mesh_objects)
-    writer.add_header("Colors", total_vertices)
+def collect_vertex_data(obj, matrices, bone_name_to_index, armature_objects=None):
+    # Reads everything the per-vertex sections need from RNA
+    mesh = obj.data
+    
+    vertex_count = len(mesh.vertices)
+    loop_count = len(mesh.loops)
+    poly_count = len(mesh.polygons)
+    
+    data = {
+        'world_matrix': matrices[0],
+        'rot_matrix': matrices[1],
+    }
+    
+    loop_vert = np.empty(loop_count, dtype=np.int32)
+    mesh.loops.foreach_get("vertex_index", loop_vert)
+    data['loop_vert'] = loop_vert
+    
+    co = np.empty(vertex_count * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", co)
+    data['co'] = co.reshape(vertex_count, 3)
+    
+    vert_normals = np.empty(vertex_count * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("normal", vert_normals)
+    data['vert_normals'] = vert_normals.reshape(vertex_count, 3)
+    
+    # Split normals were already computed by pre_process_mesh_for_export
+    loop_normals = np.empty(loop_count * 3, dtype=np.float32)
+    mesh.loops.foreach_get("normal", loop_normals)
+    data['loop_normals'] = loop_normals.reshape(loop_count, 3)
+    
+    poly_smooth = np.empty(poly_count, dtype=bool)
+    mesh.polygons.foreach_get("use_smooth", poly_smooth)
+    data['poly_smooth'] = poly_smooth
+    poly_normals = np.empty(poly_count * 3, dtype=np.float32)
+    mesh.polygons.foreach_get("normal", poly_normals)
+    data['poly_normals'] = poly_normals.reshape(poly_count, 3)
+    poly_loop_total = np.empty(poly_count, dtype=np.int32)
+    mesh.polygons.foreach_get("loop_total", poly_loop_total)
+    data['poly_loop_total'] = poly_loop_total
+    
+    data['loop_uvs'] = None
+    if mesh.uv_layers and len(mesh.uv_layers) > 0:
+        loop_uvs = np.empty(loop_count * 2, dtype=np.float32)
+        mesh.uv_layers[0].data.foreach_get("uv", loop_uvs)
+        data['loop_uvs'] = loop_uvs.reshape(loop_count, 2)
+    
+    #==-------------------------------------
+    # Skin weights. Vertices without weights bind fully to bone 0
+    
+    bones = [0] * vertex_count
+    weights = [1.0] * vertex_count
+    
+    has_weights = False
+    if bone_name_to_index:
+        for modifier in obj.modifiers:
+            if modifier.type == 'ARMATURE' and modifier.object and modifier.object in armature_objects:
+                has_weights = True
+                break
     
-    vertex_index = 0
-    for obj in mesh_objects:
-        mesh = obj.data
-        has_colors = mesh.vertex_colors and len(mesh.vertex_colors) > 0
-        
-        for _ in mesh.vertices:
-            if has_colors:
-                writer.add_field("iVertex:d Index:d Color:ffff", 
-                                 vertex_index, 0, 1.0, 1.0, 1.0, 1.0) #It's worth adding support for this in the future.
-            else:
-                writer.add_field("iVertex:d Index:d Color:ffff", 
-                                 vertex_index, 0, 1.0, 1.0, 1.0, 1.0)
+    if has_weights:
+        # Vertex group index -> bone index, unmapped groups fall back to bone 0
+        group_to_bone = [bone_name_to_index.get(group.name, 0) for group in obj.vertex_groups]
+        
+        for vert_idx, vert in enumerate(mesh.vertices):
+            max_weight = 0.0
+            max_group = -1
+            
+            for g in vert.groups:
+                weight = g.weight
+                if weight > max_weight:
+                    max_weight = weight
+                    max_group = g.group
             
-            vertex_index += 1
-            writer.add_end_line()
+            # Shared or reassigned meshes can reference groups this object does not have
+            if max_group >= 0:
+                bones[vert_idx] = group_to_bone[max_group] if max_group < len(group_to_bone) else 0
+                weights[vert_idx] = max_weight
+    
+    data['bones'] = bones
+    data['weights'] = weights
+    
+    return data
 
 #=============================================================================
 
-def export_uvs(writer, mesh_objects):
-    total_vertices = sum(len(obj.data.vertices) for obj in mesh_objects)
-    writer.add_header("UVSet", total_vertices)
+def compute_vertex_data(data):
+    # Pure numpy on arrays gathered by collect_vertex_data
+    co = data['co']
+    world_matrix = data['world_matrix']
+    loop_vert = data['loop_vert']
+    vertex_count = len(co)
     
-    vertex_index = 0
-    for obj in mesh_objects:
-        mesh = obj.data
-        has_uvs = mesh.uv_layers and len(mesh.uv_layers) > 0
-        
-        if has_uvs:
-            vert_to_uv = {}
-            
-            uv_layer = mesh.uv_layers[0].data
-            
-            for poly in mesh.polygons:
-                for loop_idx, vert_idx in zip(poly.loop_indices, poly.vertices):
-                    if vert_idx not in vert_to_uv:
-                        uv = uv_layer[loop_idx].uv
-                        vert_to_uv[vert_idx] = uv
-            
-            for vert_idx in range(len(mesh.vertices)):
-                if vert_idx in vert_to_uv:
-                    uv = vert_to_uv[vert_idx]
-                    uv_y_mirrored = 1.0 - uv.y
-                    writer.add_field("iVertex:d Index:d UV:ff", 
-                                     vertex_index, 0, uv.x, uv_y_mirrored)
-                else:
-                    writer.add_field("iVertex:d Index:d UV:ff", 
-                                     vertex_index, 0, 0.0, 1.0)
-                
-                vertex_index += 1
-                writer.add_end_line()
-        else:
-            for _ in range(len(mesh.vertices)):
-                writer.add_field("iVertex:d Index:d UV:ff", 
-                                vertex_index, 0, 0.0, 1.0)
-                vertex_index += 1
-                writer.add_end_line()
+    #==-------------------------------------
+    # Positions
+    
+    data['positions'] = co @ world_matrix[:3, :3].T + world_matrix[:3, 3]
+    
+    #==-------------------------------------
+    # Normals
+    
+    loop_normals = data['loop_normals']
+    poly_smooth = data['poly_smooth']
+    
+    # Flat faces contribute their face normal, smooth faces their loop normals
+    loop_poly = np.repeat(np.arange(len(poly_smooth)), data['poly_loop_total'])
+    loop_flat = ~poly_smooth[loop_poly]
+    loop_normals[loop_flat] = data['poly_normals'][loop_poly[loop_flat]]
+    
+    acc = np.zeros((vertex_count, 3), dtype=np.float64)
+    np.add.at(acc, loop_vert, loop_normals)
+    
+    length = np.linalg.norm(acc, axis=1)
+    has_avg = length > 0
+    acc[has_avg] /= length[has_avg, None]
+    acc[~has_avg] = data['vert_normals'][~has_avg]
+    
+    normals = acc @ data['rot_matrix'].T
+    length = np.linalg.norm(normals, axis=1)
+    normals[length > 0] /= length[length > 0, None]
+    data['normals'] = normals
+    
+    #==-------------------------------------
+    # UVs. Vertices without any UV'd loop keep the default (0, 1)
+    
+    uvs = np.zeros((vertex_count, 2), dtype=np.float64)
+    uvs[:, 1] = 1.0
+    
+    loop_uvs = data['loop_uvs']
+    if loop_uvs is not None:
+        # First loop that references each vertex provides its UV
+        used_verts, first_loop = np.unique(loop_vert, return_index=True)
+        uvs[used_verts, 0] = loop_uvs[first_loop, 0]
+        uvs[used_verts, 1] = 1.0 - loop_uvs[first_loop, 1].astype(np.float64)
+    
+    data['uvs'] = uvs
+    
+    return data
 
 #=============================================================================
 
-def export_skin_weights(writer, mesh_objects, armature_objects=None):
-    total_vertices = sum(len(obj.data.vertices) for obj in mesh_objects)
-    writer.add_header("Skin", total_vertices)
+def export_vertex_data(writer, mesh_objects, object_matrices, armature_objects=None):
+    bone_name_to_index = collect_skin_bones(armature_objects)
     
-    has_real_bones = False
+    # RNA reads are collected first, the numpy work then runs on the gathered buffers
+    vertex_data = [collect_vertex_data(obj, matrices, bone_name_to_index, armature_objects)
+                   for obj, matrices in zip(mesh_objects, object_matrices)]
+    vertex_data = [compute_vertex_data(data) for data in vertex_data]
     
-    if armature_objects:
-        for arm in armature_objects:
-            if arm.data.bones and len(arm.data.bones) > 0:
-                has_real_bones = True
-                break
+    positions = np.concatenate([data['positions'] for data in vertex_data])
+    normals = np.concatenate([data['normals'] for data in vertex_data])
+    uvs = np.concatenate([data['uvs'] for data in vertex_data])
+    bones = [bone for data in vertex_data for bone in data['bones']]
+    weights = [weight for data in vertex_data for weight in data['weights']]
     
-    bone_name_to_index = {}
+    vertex_count = len(positions)
+    vertex_idx = range(vertex_count)
+    zeros = [0] * vertex_count
+    ones = [1] * vertex_count
     
-    if has_real_bones:
-        bone_index = 0
-        for arm_obj in armature_objects:
-            for bone in arm_obj.data.bones:
-                if bone.name not in bone_name_to_index:
-                    bone_name_to_index[bone.name] = bone_index
-                    bone_index += 1
+    writer.write_columns("Vertices", "Index:d Pos:fff nNormals:d nUVSets:d nColors:d nWeights:d", 
+                         [vertex_idx, *positions.T.tolist(), ones, ones, ones, ones])
+    
+    writer.write_columns("Normals", "iVertex:d Index:d Normal:fff", 
+                         [vertex_idx, zeros, *normals.T.tolist()])
+    
+    # Vertex colors are always written as white. It's worth adding support for mesh.vertex_colors in the future.
+    white = [1.0] * vertex_count
+    writer.write_columns("Colors", "iVertex:d Index:d Color:ffff", 
+                         [vertex_idx, zeros, white, white, white, white])
+    
+    writer.write_columns("UVSet", "iVertex:d Index:d UV:ff", 
+                         [vertex_idx, zeros, *uvs.T.tolist()])
+    
+    writer.write_columns("Skin", "iVertex:d Index:d iBone:d Weight:f", 
+                         [vertex_idx, zeros, bones, weights])
+
+#=============================================================================
+
+def collect_materials(mesh_objects):
+    # Single walk over material slots and node trees shared by the header, polygons and material sections
+    material_mapping = {}
+    material_to_idx = {}
+    materials = []
+    material_images = []
+    textures = []
+    textures_set = set()
     
-    vertex_index = 0
     for obj in mesh_objects:
-        mesh = obj.data
-        
-        has_weights = False
-        armature_obj = None
-        
-        if has_real_bones:
-            for modifier in obj.modifiers:
-                if modifier.type == 'ARMATURE' and modifier.object in armature_objects:
-                    has_weights = True
-                    armature_obj = modifier.object
-                    break
-        
-        if has_real_bones and has_weights and armature_obj:
-            vertex_groups = obj.vertex_groups
-            
-            group_to_bone = {}
-            
-            for group in vertex_groups:
-                if group.name in bone_name_to_index:
-                    group_to_bone[group.index] = bone_name_to_index[group.name]
+        for slot_idx, slot in enumerate(obj.material_slots):
+            mat = slot.material
+            if not mat:
+                continue
             
-            for vert_idx, vert in enumerate(mesh.vertices):
-                vert_groups = [g for g in vert.groups if g.weight > 0]
+            mat_idx = material_to_idx.get(mat)
+            if mat_idx is None:
+                mat_idx = material_to_idx[mat] = len(materials)
+                materials.append(mat)
+                report('INFO', f"Adding material '{mat.name}' for object '{obj.name}'")
                 
-                if vert_groups:
-                    vert_groups.sort(key=lambda g: g.weight, reverse=True)
-                    
-                    group = vert_groups[0]
-                    bone_index = group_to_bone.get(group.group, 0)
-                    
-                    writer.add_field("iVertex:d Index:d iBone:d Weight:f", 
-                                     vertex_index, 0, bone_index, group.weight)
-                else:
-                    writer.add_field("iVertex:d Index:d iBone:d Weight:f", 
-                                     vertex_index, 0, 0, 1.0)
+                images = []
+                if mat.node_tree:
+                    images = [node.image for node in mat.node_tree.nodes if node.type == 'TEX_IMAGE' and node.image]
+                material_images.append(images)
                 
-                vertex_index += 1
-                writer.add_end_line()
-        else:
-            for _ in mesh.vertices:
-                writer.add_field("iVertex:d Index:d iBone:d Weight:f", 
-                                 vertex_index, 0, 0, 1.0)
-                vertex_index += 1
-                writer.add_end_line()
+                mat_textures = []
+                for image in images:
+                    if image not in textures_set:
+                        textures_set.add(image)
+                        textures.append(image)
+                        mat_textures.append(image.name)
+                if mat_textures:
+                    report('INFO', f"Material '{mat.name}' uses textures: {', '.join(mat_textures)}")
+            
+            material_mapping[(obj.name, slot_idx)] = mat_idx
+    
+    report('INFO', f"Found {len(materials)} unique materials and {len(textures)} unique textures")
+    
+    return {
+        "materials": materials,
+        "material_mapping": material_mapping,
+        "material_images": material_images,
+        "textures": textures,
+    }
 
 #=============================================================================
 
-def export_polygons(writer, mesh_objects):
+def export_polygons(writer, mesh_objects, object_matrices, material_mapping):
     
     report('INFO', f"Processing polygon data for {len(mesh_objects)} objects")
     
-    material_mapping = {}
-    all_materials = []
-    
+    # Meshes are already triangulated by pre_process_mesh_for_export
+    face_counts = []
     for obj in mesh_objects:
-        for slot_idx, slot in enumerate(obj.material_slots):
-            if slot.material and slot.material not in all_materials:
-                material_mapping[(obj.name, slot_idx)] = len(all_materials)
-                all_materials.append(slot.material)
-                report('INFO', f"Adding material '{slot.material.name}' for object '{obj.name}'")
-            else:
-                for i, mat in enumerate(all_materials):
-                    if slot.material == mat:
-                        material_mapping[(obj.name, slot_idx)] = i
-                        break
-    
-    report('INFO', f"Found {len(all_materials)} unique materials")
-    
-    all_triangles = []
-    total_triangles = 0
-    
-    for obj_idx, obj in enumerate(mesh_objects):
+        obj.data.calc_loop_triangles()
+        face_counts.append(len(obj.data.loop_triangles))
+    
+    total_triangles = sum(face_counts)
+    triangle_mesh_idx = np.empty(total_triangles, dtype=np.int32)
+    triangle_normals = np.empty((total_triangles, 3), dtype=np.float64)
+    triangle_materials = np.zeros(total_triangles, dtype=np.int32)
+    
+    start = 0
+    for obj_idx, (obj, face_count, (_, rot_matrix)) in enumerate(zip(mesh_objects, face_counts, object_matrices)):
         mesh = obj.data
-        world_matrix = obj.matrix_world
-        rot_matrix = world_matrix.to_quaternion().to_matrix()
+        end = start + face_count
         
-        bm = bmesh.new()
-        bm.from_mesh(mesh)
-        bmesh.ops.triangulate(bm, faces=bm.faces[:], quad_method='BEAUTY', ngon_method='BEAUTY')
+        report('INFO', f"Processing '{obj.name}': {face_count} triangulated faces")
         
-        face_count = len(bm.faces)
-        total_triangles += face_count
+        triangle_mesh_idx[start:end] = obj_idx
         
-        report('INFO', f"Processing '{obj.name}': {face_count} triangulated faces")
+        normals = np.empty(face_count * 3, dtype=np.float32)
+        mesh.loop_triangles.foreach_get("normal", normals)
+        normal_max = triangle_normals[start:end]
+        np.matmul(normals.reshape(face_count, 3), rot_matrix.T, out=normal_max)
+        length = np.linalg.norm(normal_max, axis=1)
+        normal_max[length > 0] /= length[length > 0, None]
         
-        for face in bm.faces:
-            normal = face.normal
-            normal_world = rot_matrix @ normal
-            normal_max = Vector((normal_world.x, normal_world.z, -normal_world.y)).normalized()
-            
-            local_mat_idx = face.material_index if len(obj.material_slots) > 0 else 0
-            global_mat_idx = material_mapping.get((obj.name, local_mat_idx), 0)
+        if len(obj.material_slots) > 0 and face_count:
+            local_mat_idx = np.empty(face_count, dtype=np.int32)
+            mesh.loop_triangles.foreach_get("material_index", local_mat_idx)
             
-            all_triangles.append({
-                'obj_idx': obj_idx,
-                'normal': normal_max,
-                'material_index': global_mat_idx
-            })
+            slot_count = max(len(obj.material_slots), int(local_mat_idx.max()) + 1)
+            slot_to_global = np.array([material_mapping.get((obj.name, i), 0) for i in range(slot_count)], dtype=np.int32)
+            triangle_materials[start:end] = slot_to_global[local_mat_idx]
+        else:
+            triangle_materials[start:end] = material_mapping.get((obj.name, 0), 0)
         
-        bm.free()
+        start = end
     
     report('INFO', f"Writing {total_triangles} triangles to MATX file")
-    writer.add_header("Polygons", total_triangles)
     
-    for triangle_idx, triangle in enumerate(all_triangles):
-        writer.add_field("iMesh:d Index:d nVerts:d Normal:fff iMaterial:d", 
-                       triangle['obj_idx'], triangle_idx, 3, 
-                       triangle['normal'].x, triangle['normal'].y, triangle['normal'].z, 
-                       triangle['material_index'])
-        writer.add_end_line()
+    writer.write_columns("Polygons", "iMesh:d Index:d nVerts:d Normal:fff iMaterial:d", 
+                         [triangle_mesh_idx.tolist(), range(total_triangles), [3] * total_triangles, 
+                          *triangle_normals.T.tolist(), triangle_materials.tolist()])
     
     report('INFO', f"Polygon export completed")
-    return all_materials
 
 #=============================================================================
 
 def export_facet_index(writer, mesh_objects):
-    all_facets = []
-    vertex_offset = 0
+    # Meshes are already triangulated by pre_process_mesh_for_export
+    for obj in mesh_objects:
+        obj.data.calc_loop_triangles()
     
-    for obj_idx, obj in enumerate(mesh_objects):
-        mesh = obj.data  
-        bm = bmesh.new()
-        bm.from_mesh(mesh)
-        bmesh.ops.triangulate(bm, faces=bm.faces[:], quad_method='BEAUTY', ngon_method='BEAUTY')
-        
-        triangles_for_obj = []
-        for face in bm.faces:
-            if len(face.verts) >= 3:
-                triangle = [face.verts[0].index + vertex_offset,
-                            face.verts[1].index + vertex_offset,
-                            face.verts[2].index + vertex_offset]
-                triangles_for_obj.append(triangle)
-        
-        all_facets.extend(triangles_for_obj)
+    facet_count = sum(len(obj.data.loop_triangles) for obj in mesh_objects)
+    all_facets = np.empty((facet_count, 3), dtype=np.int32)
+    
+    start = 0
+    vertex_offset = 0
+    for obj in mesh_objects:
+        mesh = obj.data
+        end = start + len(mesh.loop_triangles)
         
-        bm.free()
+        mesh.loop_triangles.foreach_get("vertices", all_facets[start:end].ravel())
+        all_facets[start:end] += vertex_offset
         
+        start = end
         vertex_offset += len(mesh.vertices)
     
-    total_facets = len(all_facets)
-    total_indices = total_facets * 3
-    
-    if total_indices > 0:
-        writer.add_header("FacetIndex", total_indices)
-        
-        facet_idx = 0
-        for triangle in all_facets:
-            writer.add_field("iFacet:d Index:d iVertex:d", facet_idx, 0, triangle[0])
-            writer.add_end_line()
-            writer.add_field("iFacet:d Index:d iVertex:d", facet_idx, 1, triangle[1])
-            writer.add_end_line()
-            writer.add_field("iFacet:d Index:d iVertex:d", facet_idx, 2, triangle[2])
-            writer.add_end_line()
-            facet_idx += 1
-    else:
-        writer.add_header("FacetIndex", 0)
-        writer.add_end_line()
+    writer.write_columns("FacetIndex", "iFacet:d Index:d iVertex:d", 
+                         [np.repeat(np.arange(facet_count), 3).tolist(), [0, 1, 2] * facet_count, all_facets.ravel().tolist()])
               
 #=============================================================================
 #==-------------------------------------
@@ -596,24 +599,11 @@ def export_facet_index(writer, mesh_objects):
 #==-------------------------------------    
 #=============================================================================      
 
-def export_materials(writer, materials):
-    textures = []
-    textures_set = set()
+def export_materials(writer, material_data):
+    materials = material_data["materials"]
+    textures = material_data["textures"]
     report('INFO', f"Processing {len(materials)} materials")
     
-    for mat in materials:
-        if mat and hasattr(mat, 'node_tree') and mat.node_tree:
-            mat_textures = []
-            for node in mat.node_tree.nodes:
-                if node.type == 'TEX_IMAGE' and node.image:
-                    if node.image not in textures_set:
-                        textures_set.add(node.image)
-                        textures.append(node.image)
-                        mat_textures.append(node.image.name)
-            if mat_textures:
-                report('INFO', f"Material '{mat.name}' uses textures: {', '.join(mat_textures)}")
-    
-    report('INFO', f"Found {len(textures)} unique textures")
     writer.add_header("Materials", len(materials))
     
     for idx, mat in enumerate(materials):
@@ -651,113 +641,83 @@ def export_materials(writer, materials):
     
     if len(materials) > 0 and len(textures) > 0:
         report('INFO', f"Exporting material-texture links")
-        export_material_textures(writer, materials, textures)
-    
-    return textures
+        export_material_textures(writer, materials, material_data["material_images"])
 
 #=============================================================================
 
-def export_material_textures(writer, materials, textures):
-    material_texture_links = []
-    
-    for mat_idx, mat in enumerate(materials):
-        if mat and hasattr(mat, 'node_tree') and mat.node_tree:
-            for node in mat.node_tree.nodes:
-                if node.type == 'TEX_IMAGE' and node.image:
-                    material_texture_links.append({
-                        'material_idx': mat_idx,
-                        'material_name': mat.name,
-                        'texture_path': node.image.filepath
-                    })
-                    break
-    
-    writer.add_header("Material_Textures", len(material_texture_links))
+def export_material_textures(writer, materials, material_images):
+    # Each material links the first image texture in its node tree
+    texture_paths = [images[0].filepath for images in material_images if images]
     
-    for idx, link in enumerate(material_texture_links):
-        writer.add_field("Index:d Filename:s", idx, link['texture_path'])
-        writer.add_end_line()
+    writer.write_block("Material_Textures", "Index:d Filename:s", 
+                       [(idx, path) for idx, path in enumerate(texture_paths)])
     
     export_material_params(writer, materials)
 
 #=============================================================================
 
-def export_material_params(writer, materials):
-    if not materials or len(materials) == 0:
-        return
-    
-    param_count = 0
-    for _ in materials:
-        param_count += 58
-    
-    writer.add_header("Material_ParamPkg", int(param_count))
+_PARAM_FORMAT_STR = "Index:d iMaterial:d iMap:d iPackage:s Current_0:f Current_1:f Current_2:f Current_3:f ModeType:s FPS:d iKeys:d nKeys:d nParamsPerKey:d"
+_MAP_FORMAT_STR = "Index:d iMaterial:d iMap:d iTextures:d nTextures:d TextureFPS:d iUV:d RGBASource:s FilterType:s UAddress:s VAddress:s"
+
+_PARAMS_PER_MATERIAL = 58
+_MAPS_PER_MATERIAL = 16
+
+def _build_param_rows():
+    # Every material writes the same parameter packages, only Index and iMaterial change
+    rows = [
+        (-1, "Tint Color", 255.0, 255.0, 255.0, 0.0, "CYCLE", 30, -1, 0, 3),
+        (-1, "Tint Alpha", 255.0, 0.0, 0.0, 0.0, "CYCLE", 30, -1, 0, 1),
+    ]
     
-    for mat_idx, mat in enumerate(materials):
-        writer.add_field("Index:d iMaterial:d iMap:d iPackage:s Current_0:f Current_1:f Current_2:f Current_3:f ModeType:s FPS:d iKeys:d nKeys:d nParamsPerKey:d", 
-                        mat_idx * 58, mat_idx, -1, "Tint Color", 
-                        255.0, 255.0, 255.0, 0.0, 
-                        "CYCLE", 30, -1, 0, 3)
-        writer.add_end_line()
-        
-        writer.add_field("Index:d iMaterial:d iMap:d iPackage:s Current_0:f Current_1:f Current_2:f Current_3:f ModeType:s FPS:d iKeys:d nKeys:d nParamsPerKey:d", 
-                        mat_idx * 58 + 1, mat_idx, -1, "Tint Alpha", 
-                        255.0, 0.0, 0.0, 0.0, 
-                        "CYCLE", 30, -1, 0, 1)
-        writer.add_end_line()
+    for i in range(2, _PARAMS_PER_MATERIAL):
+        current_values = [0.0, 0.0, 0.0, 0.0]
+        current_map_idx = -1
+        fps_value = 30
         
-        for i in range(2, 58):
-            package_name = None
-            current_values = [0.0, 0.0, 0.0, 0.0]
-            current_map_idx = -1
-            fps_value = 30
+        if i < 10:
+            package_name = f"Constant{i-2}"
+        else:
+            current_map_idx = (i - 10) // 3
+            map_type_idx = (i - 10) % 3
+            package_name = ["UV Translation", "UV Rotation", "UV Scale"][map_type_idx]
             
-            if i < 10:
-                package_name = f"Constant{i-2}"
-            else:
-                current_map_idx = (i - 10) // 3
-                map_type_idx = (i - 10) % 3
-                map_type = ["UV Translation", "UV Rotation", "UV Scale"][map_type_idx]
-                package_name = map_type
-                
-                if map_type == "UV Scale" and current_map_idx == 0:
-                    current_values[0] = 1.0
-                    current_values[1] = 1.0
-                
-                fps_value = 30 if current_map_idx == 0 else 0
+            if package_name == "UV Scale" and current_map_idx == 0:
+                current_values[0] = 1.0
+                current_values[1] = 1.0
             
-            writer.add_field("Index:d iMaterial:d iMap:d iPackage:s Current_0:f Current_1:f Current_2:f Current_3:f ModeType:s FPS:d iKeys:d nKeys:d nParamsPerKey:d", 
-                            mat_idx * 58 + i, mat_idx, 
-                            current_map_idx, package_name, 
-                            current_values[0], current_values[1], current_values[2], current_values[3], 
-                            "CYCLE", fps_value, -1, 0, 
-                            3 if package_name == "Tint Color" else (2 if "Translation" in package_name or "Scale" in package_name else 1))
-            writer.add_end_line()        
+            fps_value = 30 if current_map_idx == 0 else 0
+        
+        params_per_key = 2 if "Translation" in package_name or "Scale" in package_name else 1
+        rows.append((current_map_idx, package_name, *current_values, "CYCLE", fps_value, -1, 0, params_per_key))
+    
+    return rows
+
+_PARAM_ROWS = _build_param_rows()
 
 #=============================================================================
 
-def export_material_maps(writer, materials):
+def export_material_params(writer, materials):
     if not materials or len(materials) == 0:
-        writer.add_header("Material_Maps", 0)
-        writer.add_end_line()
         return
     
-    map_count = 0
-    for _ in materials:
-        map_count += 16
+    rows = [(mat_idx * _PARAMS_PER_MATERIAL + i, mat_idx, *param_row)
+            for mat_idx in range(len(materials))
+            for i, param_row in enumerate(_PARAM_ROWS)]
     
-    writer.add_header("Material_Maps", map_count)
+    writer.write_block("Material_ParamPkg", _PARAM_FORMAT_STR, rows)
+
+#=============================================================================
+
+def export_material_maps(writer, materials):
+    rows = []
     
-    for mat_idx, mat in enumerate(materials):
-        for map_idx in range(16):
-            tex_idx = mat_idx if map_idx == 0 else -1
-            tex_count = 1 if map_idx == 0 else 0
-            fps = 30 if map_idx == 0 else 0
-            uv_idx = 0 if map_idx == 0 else -1
-            
-            writer.add_field("Index:d iMaterial:d iMap:d iTextures:d nTextures:d TextureFPS:d iUV:d RGBASource:s FilterType:s UAddress:s VAddress:s", 
-                            mat_idx * 16 + map_idx, mat_idx, 
-                            map_idx, tex_idx, tex_count, fps, uv_idx, 
-                            "RGB", "BILINEAR", "WRAP", "WRAP")
-            writer.add_end_line()
+    for mat_idx in range(len(materials) if materials else 0):
+        # Only the first map of each material references its texture
+        rows.append((mat_idx * _MAPS_PER_MATERIAL, mat_idx, 0, mat_idx, 1, 30, 0, "RGB", "BILINEAR", "WRAP", "WRAP"))
+        rows.extend((mat_idx * _MAPS_PER_MATERIAL + map_idx, mat_idx, map_idx, -1, 0, 0, -1, "RGB", "BILINEAR", "WRAP", "WRAP")
+                    for map_idx in range(1, _MAPS_PER_MATERIAL))
+    
+    writer.write_block("Material_Maps", _MAP_FORMAT_STR, rows)
 
 #=============================================================================
 
@@ -780,57 +740,72 @@ def pre_process_mesh_for_export(mesh_objects):
         
         mesh = obj_copy.data
         
-        bm = bmesh.new()
-        bm.from_mesh(mesh)
-        
-        uv_layer = None
-        if hasattr(bm.loops.layers, 'uv') and bm.loops.layers.uv:
-            uv_layer = bm.loops.layers.uv.active
-            report('INFO', f"  Found UV layer")
-        
-        seam_edges = []
-        sharp_edges = []
+        edge_count = len(mesh.edges)
+        loop_count = len(mesh.loops)
+        poly_count = len(mesh.polygons)
         
         report('INFO', f"  Analyzing mesh topology for '{obj_copy.name}'")
         
-        for edge in bm.edges:
-            if len(edge.link_faces) < 2:
-                continue
-            
-            is_uv_seam = False
-            is_sharp_edge = False
-            
-            if uv_layer:
-                uv_coords = set()
-                for face in edge.link_faces:
-                    for loop in face.loops:
-                        if loop.vert in edge.verts:
-                            uv = loop[uv_layer].uv
-                            uv_coords.add((round(uv.x, 6), round(uv.y, 6)))
-                
-                if len(uv_coords) > 2:
-                    is_uv_seam = True
+        loop_edge = np.empty(loop_count, dtype=np.int32)
+        mesh.loops.foreach_get("edge_index", loop_edge)
+        poly_loop_start = np.empty(poly_count, dtype=np.int32)
+        mesh.polygons.foreach_get("loop_start", poly_loop_start)
+        poly_loop_total = np.empty(poly_count, dtype=np.int32)
+        mesh.polygons.foreach_get("loop_total", poly_loop_total)
+        poly_smooth = np.empty(poly_count, dtype=bool)
+        mesh.polygons.foreach_get("use_smooth", poly_smooth)
+        poly_normals = np.empty(poly_count * 3, dtype=np.float32)
+        mesh.polygons.foreach_get("normal", poly_normals)
+        poly_normals = poly_normals.reshape(poly_count, 3)
+        
+        # Each loop owns the edge running from its vertex to the next loop's vertex
+        loop_poly = np.repeat(np.arange(poly_count), poly_loop_total)
+        loop_next = np.arange(1, loop_count + 1, dtype=np.int32)
+        wraps = loop_next == poly_loop_start[loop_poly] + poly_loop_total[loop_poly]
+        loop_next[wraps] = poly_loop_start[loop_poly[wraps]]
+        
+        edge_faces = np.bincount(loop_edge, minlength=edge_count)
+        interior = edge_faces >= 2
+        
+        is_uv_seam = np.zeros(edge_count, dtype=bool)
+        uv_layer = mesh.uv_layers.active
+        if uv_layer:
+            report('INFO', f"  Found UV layer")
             
-            connected_faces = list(edge.link_faces)
-            if len(connected_faces) >= 2:
-                has_flat = any(not face.smooth for face in connected_faces)
-                has_smooth = any(face.smooth for face in connected_faces)
-                
-                if has_flat:
-                    face_normals = [face.normal for face in connected_faces]
-                    if len(face_normals) >= 2:
-                        angle = face_normals[0].angle(face_normals[1])
-                        if angle > 0.523599:
-                            is_sharp_edge = True
+            uvs = np.empty(loop_count * 2, dtype=np.float32)
+            uv_layer.data.foreach_get("uv", uvs)
+            uvs = np.round(uvs.reshape(loop_count, 2).astype(np.float64), 6)
             
-            if is_uv_seam:
-                seam_edges.append(edge)
-            if is_sharp_edge:
-                sharp_edges.append(edge)
+            # Distinct UVs seen at both ends of each edge across its faces
+            edge_uvs = np.column_stack((
+                np.concatenate((loop_edge, loop_edge)),
+                np.concatenate((uvs, uvs[loop_next])),
+            ))
+            unique_uvs = np.unique(edge_uvs, axis=0)
+            uv_counts = np.bincount(unique_uvs[:, 0].astype(np.int64), minlength=edge_count)
+            is_uv_seam = interior & (uv_counts > 2)
+        
+        # Flat shading on any face makes the angle between the first two faces decide sharpness
+        edge_order = np.argsort(loop_edge, kind='stable')
+        first_loop = np.searchsorted(loop_edge[edge_order], np.arange(edge_count))
+        interior_edges = np.flatnonzero(interior)
+        face0 = loop_poly[edge_order[first_loop[interior_edges]]]
+        face1 = loop_poly[edge_order[first_loop[interior_edges] + 1]]
+        
+        flat_faces = np.bincount(loop_edge[~poly_smooth[loop_poly]], minlength=edge_count)
+        dot = np.einsum('ij,ij->i', poly_normals[face0].astype(np.float64), poly_normals[face1].astype(np.float64))
+        angle = np.arccos(np.clip(dot, -1.0, 1.0))
+        
+        is_sharp_edge = np.zeros(edge_count, dtype=bool)
+        is_sharp_edge[interior_edges] = (flat_faces[interior_edges] > 0) & (angle > 0.523599)
+        
+        report('INFO', f"  Found {int(is_uv_seam.sum())} UV seam edges and {int(is_sharp_edge.sum())} sharp edges")
         
-        report('INFO', f"  Found {len(seam_edges)} UV seam edges and {len(sharp_edges)} sharp edges")
+        bm = bmesh.new()
+        bm.from_mesh(mesh)
+        bm.edges.ensure_lookup_table()
         
-        all_edges_to_split = list(set(seam_edges + sharp_edges))
+        all_edges_to_split = [bm.edges[edge_idx] for edge_idx in np.flatnonzero(is_uv_seam | is_sharp_edge).tolist()]
         
         if all_edges_to_split:
             report('INFO', f"  Splitting {len(all_edges_to_split)} edges")
@@ -843,8 +818,8 @@ def pre_process_mesh_for_export(mesh_objects):
         bm.to_mesh(mesh)
         bm.free()
         
+        # bmesh output is valid by construction, only the runtime caches need refreshing
         mesh.update()
-        mesh.validate()
         
         report('INFO', f"  Final processed mesh: {len(mesh.vertices)} vertices, {len(mesh.polygons)} faces")
         
@@ -879,8 +854,10 @@ def export_matx_file(filepath, context):
         writer = TextWriter()
         writer.open_file(filepath)
         
-        resources = write_file_header(writer, filepath, processed_mesh_objects, armature_objects)
-        materials = resources.get("materials", [])
+        material_data = collect_materials(processed_mesh_objects)
+        materials = material_data["materials"]
+        
+        write_file_header(writer, filepath, processed_mesh_objects, material_data, armature_objects)
         
         export_mesh_data(writer, processed_mesh_objects, name_mapping)
         
@@ -888,20 +865,18 @@ def export_matx_file(filepath, context):
         
         export_rigid_bodies(writer, processed_mesh_objects)
         
-        export_vertices(writer, processed_mesh_objects)
-        export_normals(writer, processed_mesh_objects)
-        export_colors(writer, processed_mesh_objects)
-        export_uvs(writer, processed_mesh_objects)
-        export_skin_weights(writer, processed_mesh_objects, armature_objects)
+        object_matrices = collect_object_matrices(processed_mesh_objects)
+        
+        export_vertex_data(writer, processed_mesh_objects, object_matrices, armature_objects)
         
-        all_materials = export_polygons(writer, processed_mesh_objects)
+        export_polygons(writer, processed_mesh_objects, object_matrices, material_data["material_mapping"])
         export_facet_index(writer, processed_mesh_objects)        
-        textures = export_materials(writer, all_materials)       
-        export_material_maps(writer, all_materials)  
+        export_materials(writer, material_data)       
+        export_material_maps(writer, materials)  
         
-        writer.fp.write("//===================================================================================\n")
-        writer.fp.write("/*\n")
-        writer.fp.write("*/\n")
+        writer.write("//===================================================================================\n"
+                     "/*\n"
+                     "*/\n")
         
         report('INFO', f"MATX export completed: {filepath}")
         return {'FINISHED'}
@@ -8,6 +8,10 @@ import bpy
 import bmesh
 import os
 import math
+import functools
+import itertools
+import numpy as np
+from collections import defaultdict
 from mathutils import Vector
 from textin import TextParser
 
@@ -18,7 +22,47 @@ def report(level, message):
 
 #=============================================================================
 
+def section_row_count(section):
+    if not section:
+        return 0
+    return section.count if section.count is not None else len(section.data)
+
+#=============================================================================
+
+def report_section_counts(sections):
+    # One report for the whole table instead of one per section.
+    # Header counts are used so sections the importer never reads stay unparsed
+    lines = [f"{label:<16} count: {section_row_count(section)}" for label, section in sections]
+    report('INFO', "Section counts:\n" + "\n".join(f"    {line}" for line in lines))
+
+#=============================================================================
+
+TEXTURE_SUBFOLDERS = ['textures', 'Textures', 'texture', 'Texture', 'resources']
+MAX_INDEXED_DIRS = 512
+
+_BONE_ORIGIN = Vector((0, 0, 0))
+_BONE_UP = Vector((0, 1, 0))
+
+@functools.lru_cache(maxsize=4096)
+def path_exists(path):
+    return os.path.exists(path)
+
+@functools.lru_cache(maxsize=256)
+def texture_dirs(base_dir):
+    # Only the subfolders that actually exist are worth probing for each texture
+    return tuple(os.path.join(base_dir, subfolder) for subfolder in TEXTURE_SUBFOLDERS 
+                 if os.path.isdir(os.path.join(base_dir, subfolder)))
+
+def clear_path_cache():
+    path_exists.cache_clear()
+    texture_dirs.cache_clear()
+
+#=============================================================================
+
 def parse_matx_file(filepath):
+    # Files may have been added or removed since the last import
+    clear_path_cache()
+    
     parser = TextParser()
     sections = parser.parse_file(filepath)   
     report('INFO', f"Loaded sections: {', '.join(sections.keys())}")
@@ -46,25 +90,34 @@ def parse_matx_file(filepath):
         material_parampkg_section = sections.get('Material_ParamPkg')
         material_maps_section     = sections.get('Material_Maps')         
      
-        report('INFO', f"Mesh             count: {len(mesh_section.data) if mesh_section else 0}")
-        report('INFO', f"Hierarchy        count: {len(hierarchy_section.data) if hierarchy_section else 0}")
-        report('INFO', f"Vertices         count: {len(vertices_section.data) if vertices_section else 0}")
-        report('INFO', f"Normal           count: {len(normals_section.data) if normals_section else 0}")
-        report('INFO', f"Color            count: {len(colors_section.data) if colors_section else 0}")
-        report('INFO', f"UV               count: {len(uvset_section.data) if uvset_section else 0}")
-        report('INFO', f"Skin             count: {len(skin_section.data) if skin_section else 0}")
-        report('INFO', f"Polygon          count: {len(polygons_section.data) if polygons_section else 0}")
-        report('INFO', f"Face             count: {len(facet_section.data) if facet_section else 0}")
-        report('INFO', f"Materials        count: {len(materials_section.data) if materials_section else 0}")
-        report('INFO', f"MaterialTextures count: {len(material_textures_section.data) if material_textures_section else 0}")
-        report('INFO', f"MaterialParamPkg count: {len(material_parampkg_section.data) if material_parampkg_section else 0}")
-        report('INFO', f"MaterialMaps     count: {len(material_maps_section.data) if material_maps_section else 0}")
+        report_section_counts([
+            ("Mesh", mesh_section),
+            ("Hierarchy", hierarchy_section),
+            ("Vertices", vertices_section),
+            ("Normal", normals_section),
+            ("Color", colors_section),
+            ("UV", uvset_section),
+            ("Skin", skin_section),
+            ("Polygon", polygons_section),
+            ("Face", facet_section),
+            ("Materials", materials_section),
+            ("MaterialTextures", material_textures_section),
+            ("MaterialParamPkg", material_parampkg_section),
+            ("MaterialMaps", material_maps_section),
+        ])
+        
+        # Consumed sections are parsed here so a malformed one fails the import instead of a stage warning
+        for section in (mesh_section, hierarchy_section, vertices_section, normals_section, uvset_section,
+                        skin_section, polygons_section, facet_section, materials_section,
+                        material_textures_section, material_maps_section):
+            if section:
+                section.data
     
         obj = create_mesh_from_matx2(
             mesh_section, vertices_section, polygons_section, facet_section, 
             filepath, normals_section, uvset_section, materials_section,
             hierarchy_section, skin_section, material_textures_section, 
-            material_maps_section, sections
+            material_maps_section
         )
     else:
         #MATX 1.0 [DEPRECATED]
@@ -80,17 +133,19 @@ def parse_matx_file(filepath):
         materials_section         = sections.get('Materials')       
         mattexture_section        = sections.get('MatTexture') 
         
-        report('INFO', f"Hierarchy        count: {len(hierarchy_section.data) if hierarchy_section else 0}")
-        report('INFO', f"Vertices         count: {len(vertices_section.data) if vertices_section else 0}")
-        report('INFO', f"Normal           count: {len(normals_section.data) if normals_section else 0}")
-        report('INFO', f"Color            count: {len(colors_section.data) if colors_section else 0}")
-        report('INFO', f"UV               count: {len(uvset_section.data) if uvset_section else 0}")
-        report('INFO', f"Skin             count: {len(skin_section.data) if skin_section else 0}")
-        report('INFO', f"Polygon          count: {len(polygons_section.data) if polygons_section else 0}")
-        report('INFO', f"Face             count: {len(facet_section.data) if facet_section else 0}")
-        report('INFO', f"Textures         count: {len(textures_section.data) if textures_section else 0}")
-        report('INFO', f"Materials        count: {len(materials_section.data) if materials_section else 0}")
-        report('INFO', f"MatTexture       count: {len(mattexture_section.data) if mattexture_section else 0}")
+        report_section_counts([
+            ("Hierarchy", hierarchy_section),
+            ("Vertices", vertices_section),
+            ("Normal", normals_section),
+            ("Color", colors_section),
+            ("UV", uvset_section),
+            ("Skin", skin_section),
+            ("Polygon", polygons_section),
+            ("Face", facet_section),
+            ("Textures", textures_section),
+            ("Materials", materials_section),
+            ("MatTexture", mattexture_section),
+        ])
         
         '''
         obj = create_mesh_from_matx(
@@ -110,7 +165,7 @@ def parse_matx_file(filepath):
 def create_mesh_from_matx2(mesh_section, vertices_section, polygons_section, facet_section, filepath, 
                            normals_section, uvset_section, materials_section,
                            hierarchy_section, skin_section, material_textures_section, 
-                           material_maps_section, all_sections=None):
+                           material_maps_section):
     
     root_name = os.path.basename(filepath).split('.')[0]
     root_obj = bpy.data.objects.new(root_name, None)
@@ -119,24 +174,27 @@ def create_mesh_from_matx2(mesh_section, vertices_section, polygons_section, fac
     root_obj.rotation_mode = 'XYZ'
     root_obj.rotation_euler = (math.radians(90), 0, 0)
     
-    global sections
-    sections = all_sections if all_sections else {}
-    material_dict = create_materials(materials_section, material_textures_section, filepath)
+    material_dict = create_materials(materials_section, material_textures_section, 
+                                     material_maps_section, filepath)
     
-    armature_obj, bone_dict = create_armature(hierarchy_section, filepath, root_obj)
+    armature_obj, bone_dict = create_armature(hierarchy_section, root_name, root_obj)
     
-    vertex_dict = process_vertices(vertices_section)
-    normal_dict = process_normals(normals_section)
-    uv_dict = process_uvs(uvset_section)
+    skin_weights = None
+    if armature_obj:
+        skin_weights = process_skin_weights(skin_section, bone_dict)
+    
+    vertex_positions = process_vertices(vertices_section)
+    normal_table = process_normals(normals_section)
+    uv_table = process_uvs(uvset_section)
     
     created_meshes = create_mesh_objects(mesh_section, root_obj, root_name)
     
-    poly_material_dict = create_polygon_material_mapping(polygons_section)
+    mat_by_poly = create_polygon_material_mapping(polygons_section)
     distribute_polygons_to_meshes(polygons_section, facet_section, created_meshes, root_obj, root_name)
     
-    meshes_created = build_mesh_geometry(created_meshes, vertex_dict, uv_dict, normal_dict, 
-                                       poly_material_dict, material_dict, bone_dict, 
-                                       armature_obj, skin_section)
+    meshes_created = build_mesh_geometry(created_meshes, vertex_positions, uv_table, normal_table, 
+                                       mat_by_poly, material_dict, bone_dict, 
+                                       armature_obj, skin_weights)
     
     report('INFO', f"Created {meshes_created} meshes")
     
@@ -148,7 +206,7 @@ def create_mesh_from_matx2(mesh_section, vertices_section, polygons_section, fac
 
 #=============================================================================
 
-def create_materials(materials_section, material_textures_section, filepath):
+def create_materials(materials_section, material_textures_section, material_maps_section, filepath):
     material_dict = {}
     if not (materials_section and materials_section.data):
         return material_dict
@@ -156,6 +214,10 @@ def create_materials(materials_section, material_textures_section, filepath):
     report('INFO', f"Processing materials, quantity: {len(materials_section.data)}")
     
     texture_paths = {}
+    file_index = new_file_index()
+    # Name snapshots of existing datablocks, updated as new ones are created
+    material_cache = {m.name: m for m in bpy.data.materials}
+    image_cache = {i.name: i for i in bpy.data.images}
     
     if material_textures_section and material_textures_section.data:
         report('INFO', f"Processing Material_Textures, quantity: {len(material_textures_section.data)}")
@@ -178,10 +240,10 @@ def create_materials(materials_section, material_textures_section, filepath):
             mat_idx = int(material_data[0])
             mat_name = str(material_data[1])
             
-            if mat_name not in bpy.data.materials:
+            blender_material = material_cache.get(mat_name)
+            if blender_material is None:
                 blender_material = bpy.data.materials.new(name=mat_name)
-            else:
-                blender_material = bpy.data.materials[mat_name]
+                material_cache[mat_name] = blender_material
             
             material_dict[mat_idx] = blender_material
             report('INFO', f"Material {mat_idx}: {mat_name} created successfully")
@@ -189,9 +251,7 @@ def create_materials(materials_section, material_textures_section, filepath):
             report('WARNING', f"Error while creating material: {str(e)}")
     
     try:
-        if 'Material_Maps' in sections:
-            material_maps_section = sections['Material_Maps']
-            
+        if material_maps_section is not None:
             for map_data in material_maps_section.data:
                 if len(map_data) >= 5:
                     try:
@@ -201,7 +261,7 @@ def create_materials(materials_section, material_textures_section, filepath):
                         if mat_idx in material_dict and tex_idx in texture_paths:
                             blender_material = material_dict[mat_idx]
                             tex_path = texture_paths[tex_idx]
-                            setup_material_nodes(blender_material, mat_idx, {mat_idx: tex_path}, filepath)
+                            setup_material_nodes(blender_material, mat_idx, {mat_idx: tex_path}, filepath, file_index, image_cache)
                             report('INFO', f"Texture is attached {tex_idx} to material {mat_idx}")
                     except Exception as e:
                         report('WARNING', f"Error attaching texture to material: {str(e)}")
@@ -212,7 +272,7 @@ def create_materials(materials_section, material_textures_section, filepath):
 
 #=============================================================================
 
-def setup_material_nodes(material, mat_idx, texture_paths, filepath):
+def setup_material_nodes(material, mat_idx, texture_paths, filepath, file_index=None, image_cache=None):
     material.use_nodes = True
     nodes = material.node_tree.nodes
     links = material.node_tree.links
@@ -232,63 +292,94 @@ def setup_material_nodes(material, mat_idx, texture_paths, filepath):
         tex_path = texture_paths[mat_idx]
     
     if tex_path:
-        resolved_path = resolve_texture_path(tex_path, filepath)
+        resolved_path = resolve_texture_path(tex_path, filepath, file_index)
         if resolved_path:
-            add_texture_to_material(nodes, links, principled_node, resolved_path, material)
+            add_texture_to_material(nodes, links, principled_node, resolved_path, material, image_cache)
         else:
             report('WARNING', f"Texture {tex_path} not found")
 
 #=============================================================================
 
-def resolve_texture_path(tex_path, filepath):
-    if os.path.exists(tex_path):
+def new_file_index():
+    # Filename -> path table for resolve_texture_path, filled by the first lookup that needs it
+    return {"built": False, "paths": {}}
+
+#=============================================================================
+
+def build_file_index(base_dir, file_index):
+    # Filename -> first path found walking base_dir, exact names win over case-insensitive matches
+    lowercase_index = {}
+    for dir_count, (root, dirs, files) in enumerate(os.walk(base_dir)):
+        if dir_count >= MAX_INDEXED_DIRS:
+            report('WARNING', f"Texture search stopped after {MAX_INDEXED_DIRS} folders under {base_dir}")
+            break
+        for name in files:
+            path = os.path.join(root, name)
+            file_index.setdefault(name, path)
+            lowercase_index.setdefault(name.lower(), path)
+    
+    for name, path in lowercase_index.items():
+        file_index.setdefault(name, path)
+    
+    return file_index
+
+#=============================================================================
+
+def resolve_texture_path(tex_path, filepath, file_index=None):
+    if path_exists(tex_path):
         return tex_path
             
     filename = os.path.basename(tex_path)
     base_dir = os.path.dirname(filepath)
     rel_path = os.path.join(base_dir, filename)
     
-    if os.path.exists(rel_path):
+    if path_exists(rel_path):
         return rel_path
     
-    for subfolder in ['textures', 'Textures', 'texture', 'Texture', 'resources']:
-        test_path = os.path.join(base_dir, subfolder, filename)
-        if os.path.exists(test_path):
+    for texture_dir in texture_dirs(base_dir):
+        test_path = os.path.join(texture_dir, filename)
+        if path_exists(test_path):
             return test_path
     
-    for root, dirs, files in os.walk(base_dir):
-        if filename in files:
-            return os.path.join(root, filename)
+    # The directory tree is walked once per import, later textures reuse the index.
+    # "built" is kept apart from the paths, so a fruitless walk is not repeated either
+    if file_index is None:
+        file_index = new_file_index()
+    if not file_index["built"]:
+        build_file_index(base_dir, file_index["paths"])
+        file_index["built"] = True
     
-    return None
+    paths = file_index["paths"]
+    return paths.get(filename) or paths.get(filename.lower())
 
 #=============================================================================
 
-def add_texture_to_material(nodes, links, principled_node, texture_path, material):
+def add_texture_to_material(nodes, links, principled_node, texture_path, material, image_cache=None):
     try:
         texture_node = nodes.new('ShaderNodeTexImage')
         texture_node.location = (-300, 0)
         
-        if os.path.basename(texture_path) not in bpy.data.images:
+        if image_cache is None:
+            image_cache = {i.name: i for i in bpy.data.images}
+        
+        image_name = os.path.basename(texture_path)
+        img = image_cache.get(image_name)
+        if img is None:
             img = bpy.data.images.load(texture_path)
-        else:
-            img = bpy.data.images[os.path.basename(texture_path)]
+            image_cache[image_name] = img
         
         texture_node.image = img
         
+        # An unlinked Vector input already samples the active UV map
         links.new(texture_node.outputs['Color'], principled_node.inputs['Base Color'])
         
-        coords_node = nodes.new('ShaderNodeTexCoord')
-        coords_node.location = (-600, 0)
-        links.new(coords_node.outputs['UV'], texture_node.inputs['Vector'])
-        
-        report('INFO', f"Texture {os.path.basename(texture_path)} loaded successfully")
+        report('INFO', f"Texture {image_name} loaded successfully")
     except Exception as e:
         report('WARNING', f"Error loading texture {texture_path}: {str(e)}")
 
 #=============================================================================
 
-def create_armature(hierarchy_section, filepath, root_obj):
+def create_armature(hierarchy_section, root_name, root_obj):
     armature_obj = None
     bone_dict = {}
     
@@ -297,7 +388,7 @@ def create_armature(hierarchy_section, filepath, root_obj):
     
     report('INFO', f"Processing armature, quantity: {len(hierarchy_section.data)}")
     
-    armature_name = os.path.basename(filepath).split('.')[0] + "_Armature"
+    armature_name = root_name + "_Armature"
     armature_data = bpy.data.armatures.new(armature_name)
     armature_obj = bpy.data.objects.new(armature_name, armature_data)
     bpy.context.collection.objects.link(armature_obj)
@@ -333,7 +424,8 @@ def create_armature(hierarchy_section, filepath, root_obj):
             'Parent': parent_idx,
             'Pos': position,
             'Rot': rotation,
-            'Scale': scale
+            'Scale': scale,
+            'Head': Vector(position)
         })
         
         bone_dict[bone_idx] = {
@@ -344,60 +436,49 @@ def create_armature(hierarchy_section, filepath, root_obj):
             "scale": scale
         }
     
+    by_id = {}
+    children = defaultdict(list)
+    for bone_data in hierarchy_data:
+        by_id.setdefault(bone_data['Index'], bone_data)
+        children[bone_data['Parent']].append(bone_data)
+    
     for bone_data in hierarchy_data:
         bone = armature_data.edit_bones.new(bone_data['Name'])
-        bone.head = Vector((0, 0, 0))
-        bone.tail = Vector((0, 0.1, 0))
+        bone.head = _BONE_ORIGIN
+        bone.tail = _BONE_UP * 0.1
         edit_bones[bone_data['Index']] = bone
     
     max_distance = 0.1
     for bone_data in hierarchy_data:
         parent_idx = bone_data['Parent']
         if parent_idx >= 0:
-            parent_data = next((b for b in hierarchy_data if b['Index'] == parent_idx), None)
+            parent_data = by_id.get(parent_idx)
             if parent_data:
-                pos1 = Vector((
-                    bone_data['Pos'][0],
-                    bone_data['Pos'][1],
-                    bone_data['Pos'][2]
-                ))
-                pos2 = Vector((
-                    parent_data['Pos'][0],
-                    parent_data['Pos'][1],
-                    parent_data['Pos'][2]
-                ))
-                distance = (pos1 - pos2).length
+                distance = (bone_data['Head'] - parent_data['Head']).length
                 max_distance = max(max_distance, distance)
     
     default_bone_length = max(0.1, max_distance * 0.2)
+    default_offset = _BONE_UP * default_bone_length
     
     for bone_data in hierarchy_data:
         bone = edit_bones[bone_data['Index']]
         
-        pos = Vector((
-            bone_data['Pos'][0],
-            bone_data['Pos'][1],
-            bone_data['Pos'][2]
-        ))
+        pos = bone_data['Head']
         
         bone.head = pos
         
-        direct_children = [b for b in hierarchy_data if b['Parent'] == bone_data['Index']]
+        direct_children = children.get(bone_data['Index'], [])
         
         if direct_children:
             if len(direct_children) == 1:
                 child_data = direct_children[0]
-                child_pos = Vector((
-                    child_data['Pos'][0],
-                    child_data['Pos'][1],
-                    child_data['Pos'][2]
-                ))
+                child_pos = child_data['Head']
                 
                 distance = (child_pos - pos).length
                 if distance < 0.01:
                     direction = (child_pos - pos).normalized()
                     if direction.length < 0.001:
-                        bone.tail = pos + Vector((0, default_bone_length, 0))
+                        bone.tail = pos + default_offset
                     else:
                         bone.tail = pos + direction * default_bone_length
                 else:
@@ -405,11 +486,7 @@ def create_armature(hierarchy_section, filepath, root_obj):
             else:
                 avg_direction = Vector((0, 0, 0))
                 for child_data in direct_children:
-                    child_pos = Vector((
-                        child_data['Pos'][0],
-                        child_data['Pos'][1],
-                        child_data['Pos'][2]
-                    ))
+                    child_pos = child_data['Head']
                     direction = (child_pos - pos)
                     if direction.length > 0.001:
                         avg_direction += direction.normalized()
@@ -418,9 +495,9 @@ def create_armature(hierarchy_section, filepath, root_obj):
                     avg_direction.normalize()
                     bone.tail = pos + avg_direction * default_bone_length
                 else:
-                    bone.tail = pos + Vector((0, default_bone_length, 0))
+                    bone.tail = pos + default_offset
         else:
-            bone.tail = pos + Vector((0, default_bone_length, 0))
+            bone.tail = pos + default_offset
     
     for bone_data in hierarchy_data:
         bone = edit_bones[bone_data['Index']]
@@ -434,20 +511,19 @@ def create_armature(hierarchy_section, filepath, root_obj):
             if head_to_parent_tail_dist < 0.01:
                 bone.use_connect = True
             else:
-                child_bones = [b for b_data in hierarchy_data 
-                              if b_data['Parent'] == parent_idx 
-                              for b in [edit_bones[b_data['Index']]]]
+                child_bones = [edit_bones[c['Index']] for c in children[parent_idx]]
                 
                 if len(child_bones) == 1:
                     parent_bone.tail = bone.head
                     bone.use_connect = True
     
     min_length = default_bone_length * 0.5
+    min_offset = _BONE_UP * min_length
     for bone in armature_data.edit_bones:
         if (bone.tail - bone.head).length < min_length:
             direction = (bone.tail - bone.head).normalized()
             if direction.length < 0.001:
-                bone.tail = bone.head + Vector((0, min_length, 0))
+                bone.tail = bone.head + min_offset
             else:
                 bone.tail = bone.head + direction * min_length
     
@@ -458,7 +534,7 @@ def create_armature(hierarchy_section, filepath, root_obj):
 #=============================================================================
 
 def process_vertices(vertices_section):
-    vertex_dict = {}
+    vertex_positions = np.empty((0, 3), dtype=np.float32)
     
     vert_pos_index = -1
     for i, field in enumerate(vertices_section.fields):
@@ -466,77 +542,90 @@ def process_vertices(vertices_section):
             vert_pos_index = i
             break
     
-    if vert_pos_index == -1:
-        return vertex_dict
+    if vert_pos_index == -1 or len(vertices_section.fields[vert_pos_index].types) < 3:
+        return vertex_positions
     
-    for i, vertex_data in enumerate(vertices_section.data):
-        try:
-            if isinstance(vertex_data[vert_pos_index], list) and len(vertex_data[vert_pos_index]) >= 3:
-                x = float(vertex_data[vert_pos_index][0])
-                y = float(vertex_data[vert_pos_index][1])
-                z = float(vertex_data[vert_pos_index][2])
-                vertex_dict[i] = (x, y, z)
-        except Exception as e:
-            report('WARNING', f"Error processing vertex {i}: {str(e)}")
+    # The parser already converted Pos into a list of floats per row, indexed by vertex
+    try:
+        positions = vertices_section.columns()[vert_pos_index]
+        vertex_positions = np.asarray(positions, dtype=np.float32).reshape(len(positions), -1)[:, :3]
+    except Exception as e:
+        report('WARNING', f"Error processing vertices: {str(e)}")
+    
+    return vertex_positions
+
+#=============================================================================
+
+def build_vertex_table(vert_indices, values):
+    # Dense per vertex table indexed by global vertex, the mask marks vertices that have a value
+    valid = vert_indices >= 0
+    size = int(vert_indices[valid].max()) + 1 if valid.any() else 0
+    
+    table = np.zeros((size, values.shape[1]), dtype=np.float32)
+    found = np.zeros(size, dtype=bool)
+    table[vert_indices[valid]] = values[valid]
+    found[vert_indices[valid]] = True
     
-    return vertex_dict
+    return {"values": table, "found": found}
 
 #=============================================================================
 
 def process_normals(normals_section):
-    normal_dict = {}
+    normal_table = None
     
     if not (normals_section and normals_section.data):
-        return normal_dict
+        return normal_table
     
     report('INFO', f"Processing normals, quantity: {len(normals_section.data)}")
     
-    for normal_data in normals_section.data:
-        try:
-            vert_idx = int(normal_data[0])
-            
-            if len(normal_data) > 2 and isinstance(normal_data[2], list) and len(normal_data[2]) >= 3:
-                nx = float(normal_data[2][0])
-                ny = float(normal_data[2][1])
-                nz = float(normal_data[2][2])
-                
-                length = math.sqrt(nx*nx + ny*ny + nz*nz)
-                if length > 0:
-                    nx, ny, nz = nx/length, ny/length, nz/length
-                
-                normal_dict[vert_idx] = (nx, ny, nz)
-        except Exception as e:
-            report('WARNING', f"Error processing vertex normal {vert_idx}: {str(e)}")
+    try:
+        rows = [normal_data for normal_data in normals_section.data
+                if len(normal_data) > 2 and isinstance(normal_data[2], list) and len(normal_data[2]) >= 3]
+        if not rows:
+            return normal_table
+        
+        vert_indices = np.fromiter((int(normal_data[0]) for normal_data in rows), dtype=np.int64, count=len(rows))
+        normals = np.asarray([normal_data[2][:3] for normal_data in rows], dtype=np.float32)
+        
+        # Zero length normals are kept as they are
+        lengths = np.linalg.norm(normals, axis=1, keepdims=True)
+        lengths[lengths == 0] = 1.0
+        normals /= lengths
+        
+        normal_table = build_vertex_table(vert_indices, normals)
+    except Exception as e:
+        report('WARNING', f"Error processing vertex normals: {str(e)}")
     
-    return normal_dict
+    return normal_table
 
 #=============================================================================
 
 def process_uvs(uvset_section):
-    uv_dict = {}
+    uv_table = None
     
     if not (uvset_section and uvset_section.data):
-        return uv_dict
+        return uv_table
     
     report('INFO', f"Processing UV coordinates, quantity: {len(uvset_section.data)}")
     
     sample_uv = uvset_section.data[0]
     has_nested_uv = (len(sample_uv) > 2 and isinstance(sample_uv[2], list) and len(sample_uv[2]) >= 2)  
-    for uv_data in uvset_section.data:
-        try:
-            vert_idx = int(uv_data[0])
-            
-            if has_nested_uv:
-                u = float(uv_data[2][0])
-                v = float(uv_data[2][1])
-                
-                v = 1.0 - v
-                
-                uv_dict[vert_idx] = (u, v)
-        except Exception as e:
-            report('WARNING', f"Error processing UV for vertex {vert_idx}: {str(e)}")
+    if not has_nested_uv:
+        return uv_table
     
-    return uv_dict
+    try:
+        uv_columns = uvset_section.columns()
+        vert_indices = np.fromiter(map(int, uv_columns[0]), dtype=np.int64, count=len(uv_columns[0]))
+        uvs = np.asarray([uv[:2] for uv in uv_columns[2]], dtype=np.float32)
+        
+        # MATX stores V top-down, Blender bottom-up
+        uvs[:, 1] = 1.0 - uvs[:, 1]
+        
+        uv_table = build_vertex_table(vert_indices, uvs)
+    except Exception as e:
+        report('WARNING', f"Error processing UV coordinates: {str(e)}")
+    
+    return uv_table
 
 #=============================================================================
 
@@ -570,19 +659,27 @@ def create_mesh_objects(mesh_section, root_obj, root_name):
 #=============================================================================
 
 def create_polygon_material_mapping(polygons_section):
-    poly_material_dict = {}
+    # Polygon indices are dense, so materials live in an array indexed by polygon, -1 for none
+    poly_rows = [(int(poly_data[1]), int(poly_data[4])) for poly_data in polygons_section.data
+                 if len(poly_data) > 4 and poly_data[4] is not None]
+    if not poly_rows:
+        return np.empty(0, dtype=np.int32)
     
-    for poly_data in polygons_section.data:
-        poly_idx = int(poly_data[1])
-        if len(poly_data) > 4 and poly_data[4] is not None:
-            mat_idx = int(poly_data[4])
-            poly_material_dict[poly_idx] = mat_idx
+    poly_indices, mat_indices = np.array(poly_rows, dtype=np.int64).T
+    valid = poly_indices >= 0
+    
+    mat_by_poly = np.full(int(poly_indices.max()) + 1 if valid.any() else 0, -1, dtype=np.int32)
+    mat_by_poly[poly_indices[valid]] = mat_indices[valid]
     
-    return poly_material_dict
+    return mat_by_poly
 
 #=============================================================================
 
 def distribute_polygons_to_meshes(polygons_section, facet_section, created_meshes, root_obj, root_name):
+    facets_by_poly = defaultdict(list)
+    for facet_data in facet_section.data:
+        facets_by_poly[facet_data[0]].append(int(facet_data[2]))
+    
     for poly_data in polygons_section.data:
         mesh_idx = int(poly_data[0])
         poly_idx = int(poly_data[1])
@@ -595,88 +692,18 @@ def distribute_polygons_to_meshes(polygons_section, facet_section, created_meshe
             mesh_obj.parent = root_obj
             created_meshes[mesh_idx] = {"obj": mesh_obj, "mesh": blender_mesh, "faces": []}
         
-        vert_indices = []
-        for facet_data in facet_section.data:
-            if facet_data[0] == poly_idx:
-                vert_indices.append(int(facet_data[2]))
+        vert_indices = facets_by_poly.get(poly_idx, ())
         
         if len(vert_indices) >= 3:
             created_meshes[mesh_idx]["faces"].append((poly_idx, vert_indices))
 
 #=============================================================================
 
-def apply_weights(mesh_obj, global_to_local_vert_map, skin_section, bone_dict, armature_obj):
-    if not (armature_obj and skin_section and skin_section.data):
-        return
-    
-    weight_dict = {}
-    
-    for skin_data in skin_section.data:
-        try:
-            global_vert_idx = int(skin_data[0])
-            bone_idx = int(skin_data[2])
-            weight = float(skin_data[3])
-            
-            if bone_idx in bone_dict and weight > 0:
-                if global_vert_idx in global_to_local_vert_map:
-                    if global_vert_idx not in weight_dict:
-                        weight_dict[global_vert_idx] = []
-                    
-                    weight_dict[global_vert_idx].append({
-                        "bone_name": bone_dict[bone_idx]["name"],
-                        "weight": weight
-                    })
-        except Exception as e:
-            report('WARNING', f"Error processing vertex weight {global_vert_idx}: {str(e)}")
-    
-    for global_vert_idx, weights in weight_dict.items():
-        local_vert_idx = global_to_local_vert_map.get(global_vert_idx)
-        if local_vert_idx is None:
-            continue
-        
-        total_weight = sum(w["weight"] for w in weights)
-        if total_weight > 0:
-            for weight_info in weights:
-                bone_name = weight_info["bone_name"]
-                norm_weight = weight_info["weight"] / total_weight
-                
-                if bone_name not in mesh_obj.vertex_groups:
-                    mesh_obj.vertex_groups.new(name=bone_name)
-                
-                vgroup = mesh_obj.vertex_groups[bone_name]
-                vgroup.add([local_vert_idx], norm_weight, 'REPLACE')
-    
-    mod = mesh_obj.modifiers.new(name="Armature", type='ARMATURE')
-    mod.object = armature_obj
-    mod.use_vertex_groups = True
-    
-#=============================================================================    
-
-def build_mesh_geometry(created_meshes, vertex_dict, uv_dict, normal_dict, 
-                      poly_material_dict, material_dict, bone_dict, 
-                      armature_obj, skin_section):
+def build_mesh_geometry(created_meshes, vertex_positions, uv_table, normal_table, 
+                      mat_by_poly, material_dict, bone_dict, 
+                      armature_obj, skin_weights):
     meshes_created = 0
     
-    all_weights = {}
-    if armature_obj and skin_section and skin_section.data:
-        for skin_data in skin_section.data:
-            try:
-                vert_idx = int(skin_data[0])
-                bone_idx = int(skin_data[2])
-                weight = float(skin_data[3])
-                
-                if bone_idx in bone_dict and weight > 0:
-                    if vert_idx not in all_weights:
-                        all_weights[vert_idx] = []
-                    
-                    all_weights[vert_idx].append({
-                        "bone_name": bone_dict[bone_idx]["name"],
-                        "weight": weight,
-                        "bone_idx": bone_idx
-                    })
-            except Exception as e:
-                report('WARNING', f"Error preparing vertex weight {vert_idx}: {str(e)}")
-    
     for mesh_idx, mesh_info in created_meshes.items():
         if not mesh_info["faces"]:
             report('WARNING', f"Mesh {mesh_idx} does not contain polygons, skipping...")
@@ -686,42 +713,51 @@ def build_mesh_geometry(created_meshes, vertex_dict, uv_dict, normal_dict,
         blender_mesh = mesh_info["mesh"]
         faces_with_indices = mesh_info["faces"]
         
-        unique_verts = set()
-        for poly_idx, face in faces_with_indices:
-            unique_verts.update(face)
-        
-        vert_map = {}
-        vertices = []
+        face_lens = np.fromiter((len(face) for poly_idx, face in faces_with_indices), 
+                                dtype=np.int64, count=len(faces_with_indices))
+        flat_verts = np.fromiter(itertools.chain.from_iterable(face for poly_idx, face in faces_with_indices), 
+                                 dtype=np.int64, count=int(face_lens.sum()))
+        loop_faces = np.repeat(np.arange(len(face_lens)), face_lens)
         
-        for idx, global_idx in enumerate(sorted(unique_verts)):
-            if global_idx in vertex_dict:
-                vertices.append(vertex_dict[global_idx])
-                vert_map[global_idx] = idx
+        # Used vertices sorted by global index, the inverse gives each loop its local index
+        vertex_count = len(vertex_positions)
+        valid_loops = (flat_verts >= 0) & (flat_verts < vertex_count)
+        used_verts, local_verts = np.unique(flat_verts[valid_loops], return_inverse=True)
+        vertices = vertex_positions[used_verts]
         
-        reverse_vert_map = {v: k for k, v in vert_map.items()}
+        # Faces left with fewer than three valid corners are dropped
+        loop_total = np.bincount(loop_faces[valid_loops], minlength=len(face_lens))
+        kept_faces = loop_total >= 3
+        loop_total = loop_total[kept_faces].astype(np.int32)
+        loop_verts = local_verts[kept_faces[loop_faces[valid_loops]]].astype(np.int32)
         
-        final_faces = []
-        poly_map = {}
+        poly_ids = np.fromiter((poly_idx for poly_idx, face in faces_with_indices), 
+                               dtype=np.int64, count=len(faces_with_indices))
+        poly_map = dict(enumerate(poly_ids[kept_faces].tolist()))
         
-        for poly_idx, face in faces_with_indices:
-            local_face = [vert_map[idx] for idx in face if idx in vert_map]
-            if len(local_face) >= 3:
-                poly_map[len(final_faces)] = poly_idx
-                final_faces.append(local_face)
+        # Flat SoA buffers pushed straight into the mesh instead of from_pydata tuples
+        loop_start = np.zeros(len(loop_total), dtype=np.int32)
+        np.cumsum(loop_total[:-1], out=loop_start[1:])
         
-        blender_mesh.from_pydata(vertices, [], final_faces)
+        blender_mesh.vertices.add(len(vertices))
+        blender_mesh.vertices.foreach_set("co", vertices.ravel())
+        blender_mesh.loops.add(len(loop_verts))
+        blender_mesh.loops.foreach_set("vertex_index", loop_verts)
+        blender_mesh.polygons.add(len(loop_total))
+        # loop_total is read only since 3.6, the face sizes follow from loop_start alone
+        blender_mesh.polygons.foreach_set("loop_start", loop_start)
+        blender_mesh.update(calc_edges=True)
         
-        apply_materials(blender_mesh, poly_map, poly_material_dict, material_dict)
+        apply_materials(blender_mesh, poly_map, mat_by_poly, material_dict)
         
-        apply_uvs(blender_mesh, uv_dict, reverse_vert_map)
+        apply_uvs(blender_mesh, uv_table, used_verts)
         
-        for poly in blender_mesh.polygons:
-            poly.use_smooth = True
+        blender_mesh.polygons.foreach_set("use_smooth", np.ones(len(blender_mesh.polygons), dtype=bool))
         
-        apply_normals(blender_mesh, normal_dict, reverse_vert_map)
+        apply_normals(blender_mesh, normal_table, used_verts)
         
         if armature_obj:
-            apply_weights_to_mesh(mesh_obj, reverse_vert_map, all_weights, armature_obj)
+            apply_weights_to_mesh(mesh_obj, used_verts, skin_weights, bone_dict, armature_obj)
         
         blender_mesh.update()
         meshes_created += 1
@@ -730,36 +766,107 @@ def build_mesh_geometry(created_meshes, vertex_dict, uv_dict, normal_dict,
 
 #=============================================================================
 
-def apply_weights_to_mesh(mesh_obj, global_to_local_vert_map, all_weights, armature_obj):
-    if not (armature_obj and all_weights):
-        return
+def process_skin_weights(skin_section, bone_dict):
+    if not (skin_section and skin_section.data and bone_dict):
+        return None
     
-    bone_vertex_groups = {}
+    skin_rows = skin_section.data
+    row_count = len(skin_rows)
     
-    for local_vert_idx, global_vert_idx in global_to_local_vert_map.items():
-        if global_vert_idx in all_weights:
-            vertex_weights = all_weights[global_vert_idx]
-            
-            total_weight = sum(w["weight"] for w in vertex_weights)
-            if total_weight > 0:
-                for weight_info in vertex_weights:
-                    bone_name = weight_info["bone_name"]
-                    norm_weight = weight_info["weight"] / total_weight
-                    
-                    if bone_name not in bone_vertex_groups:
-                        bone_vertex_groups[bone_name] = []
-                    
-                    bone_vertex_groups[bone_name].append((local_vert_idx, norm_weight))
-    
-    for bone_name, vertex_data in bone_vertex_groups.items():
-        if vertex_data:
-            if bone_name not in mesh_obj.vertex_groups:
-                vgroup = mesh_obj.vertex_groups.new(name=bone_name)
-            else:
-                vgroup = mesh_obj.vertex_groups[bone_name]
-            
-            for vert_idx, weight in vertex_data:
-                vgroup.add([vert_idx], weight, 'REPLACE')
+    try:
+        vert_col = np.fromiter((row[0] for row in skin_rows), dtype=np.int64, count=row_count)
+        bone_col = np.fromiter((row[2] for row in skin_rows), dtype=np.int64, count=row_count)
+        weight_col = np.fromiter((row[3] for row in skin_rows), dtype=np.float64, count=row_count)
+    except Exception as e:
+        report('WARNING', f"Error preparing vertex weights: {str(e)}")
+        return None
+    
+    # Bone names indexed by bone index, None where the hierarchy has no such bone
+    bone_names = [None] * (max(bone_dict) + 1)
+    for bone_idx, bone_info in bone_dict.items():
+        if bone_idx >= 0:
+            bone_names[bone_idx] = bone_info["name"]
+    known_bones = np.array([name is not None for name in bone_names], dtype=bool)
+    
+    in_range = (bone_col >= 0) & (bone_col < len(bone_names))
+    valid = (vert_col >= 0) & (weight_col > 0) & in_range
+    valid[valid] = known_bones[bone_col[valid]]
+    vert_col = vert_col[valid]
+    bone_col = bone_col[valid]
+    weight_col = weight_col[valid]
+    
+    if not len(vert_col):
+        return None
+    
+    # Each vertex's weights are normalized against the sum of all its valid influences
+    totals = np.bincount(vert_col, weights=weight_col)
+    
+    return {
+        "verts": vert_col,
+        "bones": bone_col,
+        "weights": weight_col / totals[vert_col],
+        "bone_names": bone_names,
+    }
+
+#=============================================================================
+
+def apply_weights_to_mesh(mesh_obj, global_of_local, skin_weights, bone_dict, armature_obj):
+    if not (armature_obj and skin_weights):
+        return
+    
+    skin_verts = skin_weights["verts"]
+    
+    local_of_global = np.full(int(skin_verts.max()) + 1, -1, dtype=np.int64)
+    in_range = global_of_local < len(local_of_global)
+    local_of_global[global_of_local[in_range]] = np.flatnonzero(in_range)
+    
+    skin_locals = local_of_global[skin_verts]
+    rows = np.flatnonzero(skin_locals >= 0)
+    
+    if len(rows):
+        # One sort groups influences by bone, then local vertex, keeping the skin order inside each vertex
+        skin_bones = skin_weights["bones"]
+        grouped_rows = rows[np.lexsort((skin_locals[rows], skin_bones[rows]))]
+        grouped_bones = skin_bones[grouped_rows]
+        grouped_verts = skin_locals[grouped_rows]
+        
+        # Vertex groups are created in the order their bones are first met walking by local vertex,
+        # which is the order of the first entry of each bone run
+        run_start = np.flatnonzero(np.append(True, grouped_bones[1:] != grouped_bones[:-1]))
+        creation_order = grouped_bones[run_start][np.lexsort((grouped_rows[run_start], grouped_verts[run_start]))]
+        bone_rank = np.zeros(int(grouped_bones[-1]) + 1, dtype=np.int64)
+        bone_rank[creation_order] = np.arange(len(creation_order))
+        
+        bone_names = skin_weights["bone_names"]
+        vertex_groups = mesh_obj.vertex_groups
+        vgroup_by_bone = {}
+        
+        for bone in creation_order.tolist():
+            bone_name = bone_names[bone]
+            vgroup = vertex_groups.get(bone_name)
+            if vgroup is None:
+                vgroup = vertex_groups.new(name=bone_name)
+            vgroup_by_bone[bone] = vgroup
+        
+        # REPLACE keeps the last influence of a vertex, so drop earlier duplicates before batching
+        last = np.append((grouped_bones[1:] != grouped_bones[:-1]) | (grouped_verts[1:] != grouped_verts[:-1]), True)
+        grouped_bones = grouped_bones[last]
+        grouped_verts = grouped_verts[last]
+        grouped_weights = skin_weights["weights"][grouped_rows[last]].astype(np.float32)
+        
+        # One pass over every (bone, weight) batch, vertex groups store float32 so exact weights are shared
+        batch_order = np.lexsort((grouped_weights, bone_rank[grouped_bones]))
+        batch_bones = grouped_bones[batch_order]
+        batch_weights = grouped_weights[batch_order]
+        batch_verts = grouped_verts[batch_order]
+        
+        batch_start = np.flatnonzero(np.append(True, (batch_bones[1:] != batch_bones[:-1]) | 
+                                                     (batch_weights[1:] != batch_weights[:-1])))
+        batch_end = np.append(batch_start[1:], len(batch_bones))
+        
+        for start, end in zip(batch_start.tolist(), batch_end.tolist()):
+            vgroup_by_bone[int(batch_bones[start])].add(batch_verts[start:end].tolist(), 
+                                                        float(batch_weights[start]), 'REPLACE')
     
     if mesh_obj.vertex_groups:
         mod = mesh_obj.modifiers.new(name="Armature", type='ARMATURE')
@@ -768,88 +875,112 @@ def apply_weights_to_mesh(mesh_obj, global_to_local_vert_map, all_weights, armat
 
 #=============================================================================
 
-def apply_materials(blender_mesh, poly_map, poly_material_dict, material_dict):
+def apply_materials(blender_mesh, poly_map, mat_by_poly, material_dict):
     if not material_dict:
         return
     
-    used_materials = set()
-    for blender_poly_idx, matx_poly_idx in poly_map.items():
-        if matx_poly_idx in poly_material_dict:
-            used_materials.add(poly_material_dict[matx_poly_idx])
+    blender_polys = np.fromiter(poly_map.keys(), dtype=np.int64, count=len(poly_map))
+    matx_polys = np.fromiter(poly_map.values(), dtype=np.int64, count=len(poly_map))
     
-    material_indices = {}
+    poly_mats = np.full(len(matx_polys), -1, dtype=np.int64)
+    in_range = (matx_polys >= 0) & (matx_polys < len(mat_by_poly))
+    poly_mats[in_range] = mat_by_poly[matx_polys[in_range]]
     
-    for i, mat_idx in enumerate(sorted(used_materials)):
+    used_materials = np.unique(poly_mats[poly_mats >= 0])
+    
+    # Material slot of every used MATX material, -1 where the material was not created
+    slot_of_material = np.full(len(used_materials), -1, dtype=np.int64)
+    
+    for i, mat_idx in enumerate(used_materials.tolist()):
         if mat_idx in material_dict:
             blender_mesh.materials.append(material_dict[mat_idx])
-            material_indices[mat_idx] = i
+            slot_of_material[i] = i
+    
+    poly_slots = np.full(len(poly_mats), -1, dtype=np.int64)
+    has_mat = poly_mats >= 0
+    poly_slots[has_mat] = slot_of_material[np.searchsorted(used_materials, poly_mats[has_mat])]
+    
+    # Polygons without a material keep slot 0
+    polygon_count = len(blender_mesh.polygons)
+    assign = (poly_slots >= 0) & (blender_polys >= 0) & (blender_polys < polygon_count)
+    material_index = np.zeros(polygon_count, dtype=np.int32)
+    material_index[blender_polys[assign]] = poly_slots[assign]
+    blender_mesh.polygons.foreach_set("material_index", material_index)
+
+#=============================================================================
+
+def loop_global_indices(blender_mesh, global_of_local):
+    # Global MATX vertex index of every loop
+    vertex_indices = np.empty(len(blender_mesh.loops), dtype=np.int64)
+    blender_mesh.loops.foreach_get("vertex_index", vertex_indices)
+    
+    return global_of_local[vertex_indices]
+
+#=============================================================================
+
+def gather_vertex_values(vertex_table, global_indices):
+    # Per loop values looked up from a vertex table, plus a mask of loops that had one
+    values = vertex_table["values"]
+    has_value = vertex_table["found"]
+    
+    found = (global_indices >= 0) & (global_indices < len(has_value))
+    found[found] = has_value[global_indices[found]]
     
-    for blender_poly_idx, matx_poly_idx in poly_map.items():
-        if matx_poly_idx in poly_material_dict:
-            mat_idx = poly_material_dict[matx_poly_idx]
-            if mat_idx in material_indices and blender_poly_idx < len(blender_mesh.polygons):
-                blender_mesh.polygons[blender_poly_idx].material_index = material_indices[mat_idx]
+    result = np.zeros((len(global_indices), values.shape[1]), dtype=np.float32)
+    result[found] = values[global_indices[found]]
+    
+    return result, found
 
 #=============================================================================
 
-def apply_uvs(blender_mesh, uv_dict, reverse_vert_map):
-    if not uv_dict:
+def apply_uvs(blender_mesh, uv_table, global_of_local):
+    if uv_table is None:
         return
     
     blender_mesh.uv_layers.new(name="UVMap")
     uv_layer = blender_mesh.uv_layers[0].data
     
-    for poly in blender_mesh.polygons:
-        for loop_idx in range(poly.loop_start, poly.loop_start + poly.loop_total):
-            loop = blender_mesh.loops[loop_idx]
-            vert_idx = loop.vertex_index
-            
-            global_idx = reverse_vert_map.get(vert_idx)
-            
-            if global_idx is not None and global_idx in uv_dict:
-                uv_layer[loop_idx].uv = uv_dict[global_idx]
+    # Loops without a UV keep the new layer's default of (0, 0)
+    global_indices = loop_global_indices(blender_mesh, global_of_local)
+    loop_uvs, _ = gather_vertex_values(uv_table, global_indices)
+    uv_layer.foreach_set("uv", loop_uvs.ravel())
 
 #=============================================================================
 
-def apply_normals(blender_mesh, normal_dict, reverse_vert_map):
-    if not normal_dict:
+def apply_normals(blender_mesh, normal_table, global_of_local):
+    if normal_table is None:
         return
     
     report('INFO', "Applying custom normals")
     
     try:
-        blender_mesh.update()
-
-        if bpy.app.version >= (4, 1, 0):
-            pass
-        else:
+        if bpy.app.version < (4, 1, 0):
             blender_mesh.use_auto_smooth = True
             blender_mesh.auto_smooth_angle = 3.14159
-            blender_mesh.calc_normals_split()
-          
-        custom_normals = []
-        
-        for poly in blender_mesh.polygons:
-            for loop_idx in range(poly.loop_start, poly.loop_start + poly.loop_total):
-                loop = blender_mesh.loops[loop_idx]
-                vert_idx = loop.vertex_index
-                
-                global_idx = reverse_vert_map.get(vert_idx)
-                
-                if global_idx is not None and global_idx in normal_dict:
-                    nx, ny, nz = normal_dict[global_idx]
-                    custom_normals.append((nx, ny, nz))
-                else:
-                    if bpy.app.version >= (4, 1, 0):
-                        custom_normals.append(loop.normal[:])
-                    else:
-                        custom_normals.append(loop.normal[:])
-
-        if custom_normals:
-            blender_mesh.normals_split_custom_set(custom_normals)
         
+        vertex_normals, vertex_found = gather_vertex_values(normal_table, global_of_local)
+        
+        if vertex_found.all():
+            # MATX normals are per vertex, so every loop of a vertex shares its normal
+            blender_mesh.normals_split_custom_set_from_vertices(vertex_normals)
+        else:
+            global_indices = loop_global_indices(blender_mesh, global_of_local)
+            custom_normals, found = gather_vertex_values(normal_table, global_indices)
+            
+            # Loops without a MATX normal keep the one Blender computed, so only this path needs them evaluated
+            blender_mesh.update()
+            if bpy.app.version < (4, 1, 0):
+                blender_mesh.calc_normals_split()
+            
+            loop_normals = np.empty(len(blender_mesh.loops) * 3, dtype=np.float32)
+            blender_mesh.loops.foreach_get("normal", loop_normals)
+            custom_normals[~found] = loop_normals.reshape(-1, 3)[~found]
+            
+            if len(custom_normals):
+                blender_mesh.normals_split_custom_set(custom_normals)
+        
+        # build_mesh_geometry updates the mesh once everything is applied
         blender_mesh.validate(clean_customdata=False)
-        blender_mesh.update()
         
     except Exception as e:
         report('WARNING', f"Error while setting custom normals: {str(e)}")
@@ -5,15 +5,22 @@
 #=============================================================================
 
 import bpy
-import bmesh
-import math
+import sys
+import functools
+import numpy as np
 from mathutils import Vector, Matrix, Quaternion
 
 VISUALIZATION_TAG = "matx_rb_visualization"
 PARENT_TAG = "matx_rb_parent"
 _panel_function = None
 
-from . import matx_exporter
+# Parent object name -> visualization object name
+_vis_cache = {}
+_msgbus_owner = object()
+
+# Object count seen by the last depsgraph update, a drop schedules the orphan cleanup
+_last_object_count = 0
+ORPHAN_CLEANUP_DELAY = 0.2
 
 #=========================================================================
 #==-------------------------------------
@@ -60,6 +67,7 @@ def create_rigidbody_visualization(context):
     
     vis_obj[VISUALIZATION_TAG] = True
     vis_obj[PARENT_TAG] = obj.name
+    _vis_cache[obj.name] = vis_obj.name
     
     vis_obj.hide_select = True
     vis_obj.hide_render = True
@@ -68,16 +76,59 @@ def create_rigidbody_visualization(context):
 
 #=========================================================================
 
-def remove_old_visualization(obj):
+def get_visualization_object(obj):
+    vis_name = _vis_cache.get(obj.name)
+    if vis_name is None:
+        return None
+    
+    # Names in the cache only ever come from tagged objects, renames and undo rebuild it
+    return bpy.data.objects.get(vis_name)
+
+#=========================================================================
+
+def _remove_visualization_object(vis_obj):
+    for collection in vis_obj.users_collection:
+        collection.objects.unlink(vis_obj)
+    
+    mesh = vis_obj.data
+    bpy.data.objects.remove(vis_obj)
+    if mesh and mesh.users == 0:
+        bpy.data.meshes.remove(mesh)
+
+#=========================================================================
+
+def rebuild_visualization_cache():
+    _vis_cache.clear()
     for vis_obj in bpy.data.objects:
-        if VISUALIZATION_TAG in vis_obj and vis_obj.get(PARENT_TAG) == obj.name:
-            for collection in vis_obj.users_collection:
-                collection.objects.unlink(vis_obj)
-            
-            mesh = vis_obj.data
-            bpy.data.objects.remove(vis_obj)
-            if mesh and mesh.users == 0:
-                bpy.data.meshes.remove(mesh)
+        if VISUALIZATION_TAG in vis_obj:
+            parent_name = vis_obj.parent.name if vis_obj.parent else vis_obj.get(PARENT_TAG)
+            if parent_name:
+                _vis_cache[parent_name] = vis_obj.name
+
+#=========================================================================
+
+def _invalidate_vis_cache(*args):
+    rebuild_visualization_cache()
+
+#=========================================================================
+
+def subscribe_visualization_cache():
+    bpy.msgbus.clear_by_owner(_msgbus_owner)
+    bpy.msgbus.subscribe_rna(
+        key=(bpy.types.Object, "name"),
+        owner=_msgbus_owner,
+        args=(),
+        notify=_invalidate_vis_cache,
+    )
+
+#=========================================================================
+
+def remove_old_visualization(obj):
+    vis_obj = get_visualization_object(obj)
+    if vis_obj is not None:
+        _remove_visualization_object(vis_obj)
+    
+    _vis_cache.pop(obj.name, None)
                 
 #========================================================================= 
 #==-------------------------------------
@@ -85,150 +136,143 @@ def remove_old_visualization(obj):
 #==-------------------------------------    
 #=========================================================================                
 
-def create_box_mesh(width, height, length):
-    mesh = bpy.data.meshes.new("RB_Box")
-    bm = bmesh.new()
+@functools.lru_cache(maxsize=8)
+def _ring_table(segments):
+    # Unit circle cos/sin at segments evenly spaced angles
+    angles = 2.0 * np.pi * np.arange(segments) / segments
+    return _read_only(np.cos(angles)), _read_only(np.sin(angles))
+
+#=========================================================================
+
+@functools.lru_cache(maxsize=8)
+def _arc_table(segments):
+    # Half circle cos/sin from 0 to pi inclusive, used by the capsule caps
+    half = segments // 2
+    angles = np.pi * np.arange(half + 1) / half
+    return _read_only(np.cos(angles)), _read_only(np.sin(angles))
+
+#=========================================================================
+
+def _read_only(array):
+    # Cached tables are shared between calls
+    array.flags.writeable = False
+    return array
+
+#=========================================================================
+
+def _closed_ring_edges(start, count):
+    index = np.arange(count)
+    return np.stack([start + index, start + (index + 1) % count], axis=1)
+
+#=========================================================================
+
+def _open_chain_edges(start, count):
+    index = np.arange(start, start + count)
+    return np.stack([index[:-1], index[1:]], axis=1)
+
+#=========================================================================
+
+def _first_occurrence_unique(keys):
+    # np.unique sorts, reorder so each key keeps the position it first appeared at
+    _, first, inverse = np.unique(keys, axis=0, return_index=True, return_inverse=True)
+    order = np.argsort(first)
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    return first[order], rank[inverse.reshape(-1)]
+
+#=========================================================================
+
+def _merge_coincident_vertices(verts, edges):
+    # Rings and arcs meet at shared points, weld them so the wireframe has no duplicates
+    kept_verts, remap = _first_occurrence_unique(np.round(verts, 5))
     
-    hw, hh, hl = width/2, height/2, length/2
+    edges = remap[edges]
+    edges = edges[edges[:, 0] != edges[:, 1]]
+    kept_edges, _ = _first_occurrence_unique(np.sort(edges, axis=1))
+    
+    return verts[kept_verts], edges[kept_edges]
+
+#=========================================================================
+
+def _build_wire_mesh(name, verts, edges):
+    verts, edges = _merge_coincident_vertices(verts, edges)
     
-    v1 = bm.verts.new((-hw, -hh, -hl))
-    v2 = bm.verts.new((hw, -hh, -hl))
-    v3 = bm.verts.new((hw, hh, -hl))
-    v4 = bm.verts.new((-hw, hh, -hl))
-    v5 = bm.verts.new((-hw, -hh, hl))
-    v6 = bm.verts.new((hw, -hh, hl))
-    v7 = bm.verts.new((hw, hh, hl))
-    v8 = bm.verts.new((-hw, hh, hl))
-    
-    bm.edges.new((v1, v2))
-    bm.edges.new((v2, v3))
-    bm.edges.new((v3, v4))
-    bm.edges.new((v4, v1))
-    
-    bm.edges.new((v5, v6))
-    bm.edges.new((v6, v7))
-    bm.edges.new((v7, v8))
-    bm.edges.new((v8, v5))
-    
-    bm.edges.new((v1, v5))
-    bm.edges.new((v2, v6))
-    bm.edges.new((v3, v7))
-    bm.edges.new((v4, v8))
-    
-    bm.to_mesh(mesh)
-    bm.free()
+    mesh = bpy.data.meshes.new(name)
+    mesh.from_pydata(verts.tolist(), edges.tolist(), [])
+    mesh.update()
     
     return mesh
 
 #=========================================================================
 
-def create_sphere_mesh(radius, segments=16):
-    mesh = bpy.data.meshes.new("RB_Sphere")
-    bm = bmesh.new()
+def create_box_mesh(width, height, length):
+    hw, hh, hl = width/2, height/2, length/2
     
-    for axis in range(3):
-        prev_vert = None
-        first_vert = None
-        
-        for i in range(segments):
-            angle = 2.0 * math.pi * i / segments
-            x, y, z = 0, 0, 0
-            
-            if axis == 0:
-                y = radius * math.cos(angle)
-                z = radius * math.sin(angle)
-            elif axis == 1:
-                x = radius * math.cos(angle)
-                z = radius * math.sin(angle)
-            elif axis == 2:
-                x = radius * math.cos(angle)
-                y = radius * math.sin(angle)
-            
-            vert = bm.verts.new((x, y, z))
-            
-            if prev_vert:
-                bm.edges.new((prev_vert, vert))
-            else:
-                first_vert = vert
-            
-            prev_vert = vert
-            
-            if i == segments - 1:
-                bm.edges.new((vert, first_vert))
-    
-    bm.to_mesh(mesh)
-    bm.free()
+    verts = np.array([
+        (-hw, -hh, -hl), (hw, -hh, -hl), (hw, hh, -hl), (-hw, hh, -hl),
+        (-hw, -hh, hl), (hw, -hh, hl), (hw, hh, hl), (-hw, hh, hl),
+    ])
     
-    return mesh
+    pillars = np.arange(4)
+    edges = np.concatenate([
+        _closed_ring_edges(0, 4),
+        _closed_ring_edges(4, 4),
+        np.stack([pillars, pillars + 4], axis=1),
+    ])
+    
+    return _build_wire_mesh("RB_Box", verts, edges)
+
+#=========================================================================
+
+def create_sphere_mesh(radius, segments=16):
+    cos_tab, sin_tab = _ring_table(segments)
+    c = radius * cos_tab
+    s = radius * sin_tab
+    zero = np.zeros(segments)
+    
+    # One great circle around each axis
+    verts = np.concatenate([
+        np.stack([zero, c, s], axis=1),
+        np.stack([c, zero, s], axis=1),
+        np.stack([c, s, zero], axis=1),
+    ])
+    edges = np.concatenate([_closed_ring_edges(axis * segments, segments) for axis in range(3)])
+    
+    return _build_wire_mesh("RB_Sphere", verts, edges)
 
 #=========================================================================
 
 def create_capsule_mesh(radius, height, segments=16):
-    mesh = bpy.data.meshes.new("RB_Capsule")
-    bm = bmesh.new()
-    
     cyl_height = height - 2 * radius if height > 2 * radius else 0
     half_height = cyl_height / 2
     
-    v1_bottom = bm.verts.new((0, 0, -half_height-radius))
-    v1_top = bm.verts.new((0, 0, half_height+radius))
-    bm.edges.new((v1_bottom, v1_top))
-    
-    v2_bottom = bm.verts.new((0, radius, -half_height))
-    v2_top = bm.verts.new((0, radius, half_height))
-    bm.edges.new((v2_bottom, v2_top))
-    
-    v3_bottom = bm.verts.new((radius, 0, -half_height))
-    v3_top = bm.verts.new((radius, 0, half_height))
-    bm.edges.new((v3_bottom, v3_top))
+    vert_blocks = [np.array([
+        (0, 0, -half_height-radius), (0, 0, half_height+radius),
+        (0, radius, -half_height), (0, radius, half_height),
+        (radius, 0, -half_height), (radius, 0, half_height),
+    ])]
+    edge_blocks = [np.array([(0, 1), (2, 3), (4, 5)])]
+    start = 6
     
+    cos_tab, sin_tab = _ring_table(segments)
     for z in [-half_height, half_height]:
-        prev_vert = None
-        first_vert = None
-        
-        for i in range(segments):
-            angle = 2.0 * math.pi * i / segments
-            x = radius * math.cos(angle)
-            y = radius * math.sin(angle)
-            
-            vert = bm.verts.new((x, y, z))
-            
-            if prev_vert:
-                bm.edges.new((prev_vert, vert))
-            else:
-                first_vert = vert
-            
-            prev_vert = vert
-            
-            if i == segments - 1:
-                bm.edges.new((vert, first_vert))
-    
+        edge_blocks.append(_closed_ring_edges(start, segments))
+        vert_blocks.append(np.stack([radius * cos_tab, radius * sin_tab, np.full(segments, z)], axis=1))
+        start += segments
+    
+    arc_cos, arc_sin = _arc_table(segments)
+    arc_count = len(arc_cos)
+    side = radius * arc_sin
+    zero = np.zeros(arc_count)
     for cap_z, cap_sign in [(-half_height, -1), (half_height, 1)]:
-        for axis in range(2):
-            prev_vert = None
-            
-            for i in range(segments // 2 + 1):
-                angle = math.pi * i / (segments // 2)
-                x, y, z = 0, 0, 0
-                
-                if axis == 0:
-                    x = radius * math.sin(angle)
-                    z = cap_z + cap_sign * radius * math.cos(angle)
-                    vert = bm.verts.new((x, 0, z))
-                else:
-                    y = radius * math.sin(angle)
-                    z = cap_z + cap_sign * radius * math.cos(angle)
-                    vert = bm.verts.new((0, y, z))
-                
-                if prev_vert:
-                    bm.edges.new((prev_vert, vert))
-                
-                prev_vert = vert
-    
-    bm.to_mesh(mesh)
-    bm.free()
+        z = cap_z + cap_sign * radius * arc_cos
+        
+        for axis_verts in [(side, zero, z), (zero, side, z)]:
+            edge_blocks.append(_open_chain_edges(start, arc_count))
+            vert_blocks.append(np.stack(axis_verts, axis=1))
+            start += arc_count
     
-    return mesh
+    return _build_wire_mesh("RB_Capsule", np.concatenate(vert_blocks), np.concatenate(edge_blocks))
     
 #=========================================================================
 #==-------------------------------------
@@ -247,29 +291,18 @@ def fit_rigidbody_to_mesh(context):
     if len(mesh.vertices) == 0:
         return {'CANCELLED'}
     
-    min_x = min_y = min_z = float('inf')
-    max_x = max_y = max_z = float('-inf')
-    
-    for vert in mesh.vertices:
-        co = vert.co
-        
-        min_x = min(min_x, co.x)
-        min_y = min(min_y, co.y)
-        min_z = min(min_z, co.z)
-        
-        max_x = max(max_x, co.x)
-        max_y = max(max_y, co.y)
-        max_z = max(max_z, co.z)
+    vert_count = len(mesh.vertices)
+    coords = np.empty(vert_count * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", coords)
+    coords = coords.reshape(vert_count, 3)
     
-    width = max_x - min_x
-    height = max_y - min_y
-    length = max_z - min_z
+    bounds_min = coords.min(axis=0).astype(np.float64)
+    bounds_max = coords.max(axis=0).astype(np.float64)
     
-    center_x = (min_x + max_x) / 2
-    center_y = (min_y + max_y) / 2
-    center_z = (min_z + max_z) / 2
+    width, height, length = (bounds_max - bounds_min).tolist()
+    center = ((bounds_min + bounds_max) / 2).tolist()
     
-    rb.body_position = (center_x, center_y, center_z)
+    rb.body_position.foreach_set(center)
     
     if rb.rb_type == 'BOX':
         rb.width = width
@@ -283,62 +316,86 @@ def fit_rigidbody_to_mesh(context):
         rb.radius = max_xy / 2
         rb.height = length
     
-    for vis_obj in bpy.data.objects:
-        if VISUALIZATION_TAG in vis_obj and vis_obj.get(PARENT_TAG) == obj.name:
-            create_rigidbody_visualization(context)
-            break
+    if get_visualization_object(obj) is not None:
+        create_rigidbody_visualization(context)
     
     return {'FINISHED'}
 
 #=========================================================================
 
+def remove_orphaned_visualizations():
+    objects = bpy.data.objects
+    
+    # Only tracked visualizations are checked, keyed by their parent's name
+    for parent_name, vis_name in list(_vis_cache.items()):
+        if parent_name in objects:
+            continue
+        
+        _vis_cache.pop(parent_name, None)
+        vis_obj = objects.get(vis_name)
+        if vis_obj is not None:
+            _remove_visualization_object(vis_obj)
+    
+    return None
+
+#=========================================================================
+
 @bpy.app.handlers.persistent
 def on_object_removed(dummy):
-    vis_objects = [obj for obj in bpy.data.objects if VISUALIZATION_TAG in obj]
+    global _last_object_count
     
-    for vis_obj in vis_objects:
-        parent_name = vis_obj.get(PARENT_TAG)
-        parent_exists = False
-        
-        if parent_name:
-            parent_exists = parent_name in bpy.data.objects and bpy.data.objects[parent_name] is not None
-
-        if not parent_exists:
-            mesh = vis_obj.data
-            for collection in vis_obj.users_collection:
-                collection.objects.unlink(vis_obj)
-            bpy.data.objects.remove(vis_obj)
-            if mesh and mesh.users == 0:
-                bpy.data.meshes.remove(mesh)
+    # Runs on every depsgraph update, so only compare counts and defer the real work
+    object_count = len(bpy.data.objects)
+    if (object_count < _last_object_count and _vis_cache and 
+            not bpy.app.timers.is_registered(remove_orphaned_visualizations)):
+        bpy.app.timers.register(remove_orphaned_visualizations, first_interval=ORPHAN_CLEANUP_DELAY)
+    
+    _last_object_count = object_count
        
 #=========================================================================
        
 def cleanup_all_visualizations():
+    # Full sweep for files that may hold visualizations this session never tracked
+    _vis_cache.clear()
     vis_objects = [obj for obj in bpy.data.objects if VISUALIZATION_TAG in obj]
     
     for vis_obj in vis_objects:
-        mesh = vis_obj.data
-        for collection in vis_obj.users_collection:
-            collection.objects.unlink(vis_obj)
-        bpy.data.objects.remove(vis_obj)
-        if mesh and mesh.users == 0:
-            bpy.data.meshes.remove(mesh)                
+        _remove_visualization_object(vis_obj)
 
 #=========================================================================
 
 def exclude_visualizations_from_export():
+    # Called right before an export, so the exporter is only loaded once it is used
+    from . import matx_exporter
+    
+    # Every export calls this, so never wrap an already wrapped exporter
+    if getattr(matx_exporter.pre_process_mesh_for_export, "_matx_vis_wrapped", False):
+        return
     
     original_process_func = matx_exporter.pre_process_mesh_for_export
     
     def filtered_pre_process_mesh_for_export(mesh_objects):
-        filtered_objects = [obj for obj in mesh_objects if VISUALIZATION_TAG not in obj]
-        
-        return original_process_func(filtered_objects)
+        # Checked by tag rather than the cache so untracked visualizations are skipped too, one pass is enough
+        return original_process_func(obj for obj in mesh_objects if VISUALIZATION_TAG not in obj)
     
+    filtered_pre_process_mesh_for_export._matx_vis_wrapped = True
+    filtered_pre_process_mesh_for_export._original = original_process_func
     matx_exporter.pre_process_mesh_for_export = filtered_pre_process_mesh_for_export
 
 #=========================================================================
 
+def restore_export_pre_process():
+    # Nothing was wrapped if no export ran this session
+    matx_exporter = sys.modules.get(f"{__package__}.matx_exporter")
+    if matx_exporter is None:
+        return
+    
+    original_process_func = getattr(matx_exporter.pre_process_mesh_for_export, "_original", None)
+    if original_process_func is not None:
+        matx_exporter.pre_process_mesh_for_export = original_process_func
+
+#=========================================================================
+
 class MATX_OT_create_rigidbody_visualization(bpy.types.Operator):
     bl_idname = "matx.create_rigidbody_visualization"
     bl_label = "Create RigidBody Visualization"
@@ -365,11 +422,7 @@ class MATX_OT_remove_rigidbody_visualization(bpy.types.Operator):
         if not (context.object and hasattr(context.object, 'matx_rigid_body')):
             return False
         
-        for obj in bpy.data.objects:
-            if (VISUALIZATION_TAG in obj and 
-                obj.get(PARENT_TAG) == context.object.name):
-                return True
-        return False
+        return get_visualization_object(context.object) is not None
     
     def execute(self, context):
         obj = context.object
@@ -404,11 +457,7 @@ def add_buttons_to_panel():
         
         layout = self.layout
         
-        has_vis = False
-        for vis_obj in bpy.data.objects:
-            if VISUALIZATION_TAG in vis_obj and vis_obj.get(PARENT_TAG) == obj.name:
-                has_vis = True
-                break
+        has_vis = get_visualization_object(obj) is not None
         
         box = layout.box()
         box.label(text="Visualization")
@@ -428,7 +477,9 @@ def add_buttons_to_panel():
 
 #=========================================================================     
         
+@bpy.app.handlers.persistent
 def on_file_load(dummy):
+    subscribe_visualization_cache()
     bpy.app.timers.register(cleanup_all_visualizations, first_interval=0.5)
 
 #=========================================================================    
@@ -436,6 +487,13 @@ def on_file_load(dummy):
 @bpy.app.handlers.persistent
 def on_file_save(dummy):
     cleanup_all_visualizations()        
+
+#=========================================================================    
+
+@bpy.app.handlers.persistent
+def on_undo_redo(dummy):
+    # Undo restores objects without their cache entries
+    rebuild_visualization_cache()
         
 #=========================================================================
 #==-------------------------------------
@@ -457,15 +515,35 @@ def register():
     bpy.app.handlers.load_post.append(on_file_load)
     bpy.app.handlers.save_pre.append(on_file_save)
     bpy.app.handlers.depsgraph_update_post.append(on_object_removed)
+    bpy.app.handlers.undo_post.append(on_undo_redo)
+    bpy.app.handlers.redo_post.append(on_undo_redo)
+    
+    subscribe_visualization_cache()
     
-    exclude_visualizations_from_export()
+    # bpy.data is restricted during register(), pick up existing visualizations once it is not
+    bpy.app.timers.register(rebuild_visualization_cache, first_interval=0.0)
 
 #=========================================================================   
 
 def unregister(): 
+    restore_export_pre_process()
+    
+    bpy.msgbus.clear_by_owner(_msgbus_owner)
+    _vis_cache.clear()
+    
     if on_object_removed in bpy.app.handlers.depsgraph_update_post:
         bpy.app.handlers.depsgraph_update_post.remove(on_object_removed)
     
+    if bpy.app.timers.is_registered(remove_orphaned_visualizations):
+        bpy.app.timers.unregister(remove_orphaned_visualizations)
+    
+    if bpy.app.timers.is_registered(rebuild_visualization_cache):
+        bpy.app.timers.unregister(rebuild_visualization_cache)
+    
+    for handlers in (bpy.app.handlers.undo_post, bpy.app.handlers.redo_post):
+        if on_undo_redo in handlers:
+            handlers.remove(on_undo_redo)
+    
     if on_file_load in bpy.app.handlers.load_post:
         bpy.app.handlers.load_post.remove(on_file_load)
     
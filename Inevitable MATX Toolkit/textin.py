@@ -6,8 +6,41 @@
 
 import re
 import os
+import mmap
+import itertools
 from enum import Enum
-from typing import List, Dict, Any, Optional, Tuple, Union
+from typing import List, Dict, Any, Optional, Tuple, Union, Iterable
+
+#=============================================================================
+
+READ_BLOCK_SIZE = 1024 * 1024
+
+# Whitespace separated token, a quoted run may contain whitespace and runs to the line end when unterminated
+_TOKEN_RE = re.compile(r'(?:[^\s"]|"[^"]*"?)+')
+
+# One "name:types" entry of a field list, separators skipped and the name running up to the splitter
+_FIELD_RE = re.compile(r'[\s,]*([^:]*)(:?)([^\W\d_]*)')
+
+# "[name]" or "[name : count]" section header, anything after a second ':' is ignored
+_HEADER_RE = re.compile(r'\[([^\]:]*)(?::([^\]:]*))?')
+
+#=============================================================================
+
+def _decode_lines(stream) -> Iterable[str]:
+    # Decoded a block at a time, every block is cut at a line end so no character or '\r\n' pair is split
+    while True:
+        block = stream.read(READ_BLOCK_SIZE)
+        if not block:
+            return
+        block += stream.readline()
+        
+        text = block.decode('utf-8', errors='replace')
+        
+        # Match the universal newline handling of text mode reads
+        if '\r' in text:
+            text = text.replace('\r\n', '\n').replace('\r', '\n')
+        
+        yield from text.split('\n')
 
 #=============================================================================
 
@@ -19,10 +52,44 @@ class TextType(Enum):
     
     @classmethod
     def from_char(cls, char: str) -> 'TextType':
-        char = char.upper()
-        for type_enum in cls:
-            if char == type_enum.value:
-                return type_enum
+        return _TYPE_MAP.get(char)
+
+# Both cases of every type letter, unknown letters resolve to None
+_TYPE_MAP = {char: type_enum for type_enum in TextType for char in (type_enum.value, type_enum.value.lower())}
+
+#=============================================================================
+
+def _strip_quotes(value: str) -> str:
+    if value.startswith('"') and value.endswith('"'):
+        return value[1:-1]
+    return value
+
+# Value converter per field type, resolved once per field instead of per value
+_CONVERTERS = {
+    TextType.INTEGER: int,
+    TextType.FLOAT:   float,
+    TextType.STRING:  _strip_quotes,
+    TextType.GUID:    str,
+}
+
+def _convert_columns(lines: List[str], converters: List[Any]) -> Optional[List[List[Any]]]:
+    # Unquoted sections are converted one whole column at a time, None sends them to the per row path
+    width = len(converters)
+    if not width or any('"' in line for line in lines):
+        return None
+    
+    rows = [line.split() for line in lines]
+    if rows and min(map(len, rows)) < width:
+        return None
+    
+    if rows and max(map(len, rows)) > width:
+        rows = [values[:width] for values in rows]
+    
+    values = list(itertools.chain.from_iterable(rows))
+    try:
+        return [list(map(convert, values[column::width])) for column, convert in enumerate(converters)]
+    except ValueError:
+        return None
 
 #=============================================================================
 
@@ -30,27 +97,11 @@ class TextField:
     def __init__(self, name: str, type_chars: str):
         self.name = name
         self.type_chars = type_chars
-        self.types = []
-        
-        for char in type_chars:
-            data_type = TextType.from_char(char)
-            self.types.append(data_type)
+        self.types = [_TYPE_MAP.get(char) for char in type_chars]
+        self.converters = [_CONVERTERS[data_type] for data_type in self.types]
     
     def parse_value(self, values: List[str]) -> List[Any]:
-        result = []
-        for i, (value, data_type) in enumerate(zip(values, self.types)):
-            if data_type == TextType.INTEGER:
-                result.append(int(value))
-            elif data_type == TextType.FLOAT:
-                result.append(float(value))
-            elif data_type == TextType.STRING:
-                if value.startswith('"') and value.endswith('"'):
-                    result.append(value[1:-1])
-                else:
-                    result.append(value)
-            elif data_type == TextType.GUID:
-                result.append(value)             
-        return result   
+        return [convert(value) for convert, value in zip(self.converters, values)]
 
 #=============================================================================
 
@@ -60,14 +111,56 @@ class TextSection:
         self.count = count
         self.fields = []
         self.data = []
+        self._columns = None
     
     def add_field(self, field: TextField):
         self.fields.append(field)
+        self._columns = None
     
     def add_data_row(self, row: List[Any]):
         if len(row) != len(self.fields):
             raise ValueError(f"Count elements in row ({len(row)}) not match fields count ({len(self.fields)}). Aborting!")      
         self.data.append(row)
+        self._columns = None
+    
+    def add_data_rows(self, rows: List[List[Any]]):
+        for row in rows:
+            if len(row) != len(self.fields):
+                raise ValueError(f"Count elements in row ({len(row)}) not match fields count ({len(self.fields)}). Aborting!")
+        self.data.extend(rows)
+        self._columns = None
+    
+    def columns(self) -> List[Tuple[Any, ...]]:
+        # Field major view of data, one transpose shared by every caller until rows change
+        if self._columns is None:
+            self._columns = list(zip(*self.data)) if self.data else [() for _ in self.fields]
+        return self._columns
+
+#=============================================================================
+
+class _LazySection(TextSection):
+    # Keeps the raw text of a section until one of its parsed attributes is first read
+    def __init__(self, parser: 'TextParser', name: str, count_str: Optional[str], section_content: str):
+        self.name = name
+        self._source = (parser, count_str, section_content)
+        
+        # The header count is known without parsing, a malformed one is left for parse_section to report
+        self.count = int(count_str) if count_str and count_str.isdigit() else None
+    
+    def __getattr__(self, attr: str) -> Any:
+        # Only reached for attributes that are not set yet, i.e. while the section is unparsed
+        source = self.__dict__.get('_source')
+        if source is None:
+            raise AttributeError(attr)
+        
+        parser, count_str, section_content = source
+        section = parser.parse_section(self.name, count_str, section_content)
+        del self._source
+        self.__dict__.update(section.__dict__)
+        
+        if parser.sections.get(self.name) is self:
+            parser.sections[self.name] = section
+        return getattr(self, attr)
 
 #=============================================================================
 
@@ -82,50 +175,64 @@ class TextParser:
             
         self.filepath = filepath
         
-        with open(filepath, 'r', encoding='utf-8', errors='replace') as f:
-            content = f.read()
-        
+        with open(filepath, 'rb', buffering=READ_BLOCK_SIZE) as f:
+            try:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except (ValueError, OSError):
+                # Empty files and some filesystems cannot be mapped, stream them through the buffer
+                return self.parse_lines(_decode_lines(f))
+            
+            with mm:
+                # The file is read front to back once, let the kernel read ahead (not available on Windows)
+                if hasattr(mmap, 'MADV_SEQUENTIAL'):
+                    mm.madvise(mmap.MADV_SEQUENTIAL)
+                return self.parse_lines(_decode_lines(mm))
+    
+    def parse_text(self, content: str) -> Dict[str, TextSection]:
+        return self.parse_lines(content.split('\n'))
+    
+    def parse_lines(self, lines: Iterable[str]) -> Dict[str, TextSection]:
         sections = {}
         current_section = None
-        current_content = ""
+        current_content = []
         
-        lines = content.split('\n')
-        i = 0
         in_quotes = False
         
-        while i < len(lines):
-            line = lines[i].strip()
-            i += 1
+        for line in lines:
+            line = line.strip()
             
             if not line:
                 continue
             
-            for char in line:
-                if char == '"':
-                    in_quotes = not in_quotes
+            # An odd number of quotes on the line flips the quoted state
+            if '"' in line and line.count('"') % 2:
+                in_quotes = not in_quotes
             
             if not in_quotes and line.startswith('[') and ']' in line:
                 if current_section:
-                    self.parse_section(current_section[0], current_section[1], current_content)
-                    current_content = ""
+                    self.add_section(current_section[0], current_section[1], "\n".join(current_content))
+                    current_content = []
                 
-                section_header = line[1:line.index(']')]
-                parts = section_header.split(':')
+                name, count_str = _HEADER_RE.match(line).groups()
                 
-                name = parts[0].strip()
-                count_str = parts[1].strip() if len(parts) > 1 else None
+                name = name.strip()
+                count_str = count_str.strip() if count_str is not None else None
                 
                 current_section = (name, count_str)
             else:
                 if current_section:
-                    current_content += line + "\n"
+                    current_content.append(line)
         
         if current_section:
-            self.parse_section(current_section[0], current_section[1], current_content)
+            self.add_section(current_section[0], current_section[1], "\n".join(current_content))
         
         return self.sections
     
-    def parse_section(self, name: str, count_str: str, section_content: str):
+    def add_section(self, name: str, count_str: Optional[str], section_content: str):
+        # Parsing is deferred until the section is used, sections nobody reads cost only their text
+        self.sections[name] = _LazySection(self, name, count_str, section_content)
+    
+    def parse_section(self, name: str, count_str: Optional[str], section_content: str) -> TextSection:
         count = int(count_str) if count_str else None
         section = TextSection(name, count)
         
@@ -135,94 +242,90 @@ class TextParser:
         if fields_match:
             fields_raw = fields_match.group(1).strip()
             
-            i = 0
-            while i < len(fields_raw):
-                while i < len(fields_raw) and (fields_raw[i].isspace() or fields_raw[i] in ','):
-                    i += 1
-                
-                if i >= len(fields_raw):
-                    break
-                
-                field_name = ""
-                while i < len(fields_raw) and fields_raw[i] != ':':
-                    field_name += fields_raw[i]
-                    i += 1
-                
+            for field_match in _FIELD_RE.finditer(fields_raw):
+                field_name, splitter, field_type = field_match.groups()
                 field_name = field_name.strip()
                 
-                if i < len(fields_raw) and fields_raw[i] == ':':
-                    i += 1
-                else:
-                    raise ValueError(f"Not found splitter ':' after row name '{field_name}'. Aborting!")
-                
-                field_type = ""
-                while i < len(fields_raw) and fields_raw[i].isalpha():
-                    field_type += fields_raw[i]
-                    i += 1
+                if not splitter:
+                    if field_name:
+                        raise ValueError(f"Not found splitter ':' after row name '{field_name}'. Aborting!")
+                    break
                 
-                valid_types = {'d', 'D', 'f', 'F', 's', 'S', 'g', 'G'}
                 for char in field_type:
-                    if char not in valid_types:
+                    if char not in _TYPE_MAP:
                         raise ValueError(f"Unexpected dimension '{char}' in row '{field_name}'. Aborting!")
                 
                 if field_name and field_type:
                     field = TextField(field_name, field_type)
                     section.add_field(field)
         
-        lines = []
-        is_commentary = False
-        for line in section_content.split('\n'):
-            line_stripped = line.strip()
-            
-            if '/*' in line_stripped and not is_commentary:
-                is_commentary = True
-                parts = line_stripped.split('/*', 1)
-                if parts[0].strip() and not parts[0].strip().startswith('//'):
-                    lines.append(parts[0].strip())
-                continue
-            
-            if '*/' in line_stripped and is_commentary:
-                is_commentary = False               
-                parts = line_stripped.split('*/', 1)
-                if len(parts) > 1 and parts[1].strip() and not parts[1].strip().startswith('//'):
-                    lines.append(parts[1].strip())
-                continue
-            
-            if is_commentary:
-                continue
-            
-            if line_stripped and not line_stripped.startswith('//'):
-                lines.append(line_stripped)
+        if '/*' not in section_content:
+            # Without block comments only whole line comments are left, one pass drops them and the field list
+            # Lines arrive stripped from parse_lines, so they are not stripped again
+            data_lines = [line for line in section_content.split('\n')
+                          if line and not line.startswith(('//', '{', '-'))]
+        else:
+            lines = []
+            is_commentary = False
+            for line in section_content.split('\n'):
+                line_stripped = line.strip()
+                
+                if '/*' in line_stripped and not is_commentary:
+                    is_commentary = True
+                    parts = line_stripped.split('/*', 1)
+                    if parts[0].strip() and not parts[0].strip().startswith('//'):
+                        lines.append(parts[0].strip())
+                    continue
                 
-        data_lines = [line for line in lines if not (line.startswith('{') or line.startswith('-'))]
+                if '*/' in line_stripped and is_commentary:
+                    is_commentary = False               
+                    parts = line_stripped.split('*/', 1)
+                    if len(parts) > 1 and parts[1].strip() and not parts[1].strip().startswith('//'):
+                        lines.append(parts[1].strip())
+                    continue
+                
+                if is_commentary:
+                    continue
+                
+                if line_stripped and not line_stripped.startswith('//'):
+                    lines.append(line_stripped)
+                    
+            data_lines = [line for line in lines if not (line.startswith('{') or line.startswith('-'))]
                     
         field_value_counts = []
         for field in section.fields:
             field_value_counts.append(len(field.types))
         
+        # Whole row converted in one pass, then regrouped into single values and lists per field
+        row_converters = [convert for field in section.fields for convert in field.converters]
+        row_layout = []
+        value_index = 0
+        for num_values in field_value_counts:
+            row_layout.append((value_index, value_index + num_values, num_values == 1))
+            value_index += num_values
+        
+        columns = _convert_columns(data_lines, row_converters)
+        if columns is not None:
+            field_columns = [columns[start] if single else list(map(list, zip(*columns[start:end])))
+                             for start, end, single in row_layout]
+            section.add_data_rows(list(map(list, zip(*field_columns))))
+            data_lines = []
+        
         for line in data_lines:
-            line = line.strip()
-            if not line:
-                continue
+            values = _TOKEN_RE.findall(line) if '"' in line else line.split()
             
-            values = []
-            current = ""
-            in_quotes = False
-            
-            for char in line:
-                if char == '"':
-                    in_quotes = not in_quotes
-                    current += char
-                elif char.isspace() and not in_quotes:
-                    if current:
-                        values.append(current)
-                        current = ""
-                else:
-                    current += char
-            
-            if current:
-                values.append(current)
+            if len(values) >= len(row_converters):
+                try:
+                    converted = [convert(value) for convert, value in zip(row_converters, values)]
+                except ValueError:
+                    converted = None
+                
+                if converted is not None:
+                    section.add_data_row([converted[start] if single else converted[start:end]
+                                          for start, end, single in row_layout])
+                    continue
             
+            # Slow path, reports which field is malformed
             parsed_row = []
             value_index = 0
             
@@ -247,6 +350,6 @@ class TextParser:
         if count is not None and len(section.data) != count:
             raise ValueError(f"Unexpected dimension in section [{name}]. Expected {count} rows, but found {len(section.data)}. Aborting!")    
         
-        self.sections[name] = section
+        return section
         
 #=============================================================================        
\ No newline at end of file
@@ -5,9 +5,14 @@
 #=============================================================================
 
 import os
-from typing import List, Dict, Any, Optional, Tuple, Union
+from typing import List, Optional, Tuple
 from enum import Enum
 
+WRITE_BUFFER_SIZE = 1024 * 1024
+
+# Output is written in binary, so keep the platform line endings text mode used to produce
+NEWLINE = os.linesep
+
 #=============================================================================
 
 class TextType(Enum):
@@ -18,10 +23,10 @@ class TextType(Enum):
     
     @classmethod
     def from_char(cls, char: str) -> 'TextType':
-        char = char.upper()
-        for type_enum in cls:
-            if char == type_enum.value:
-                return type_enum
+        return _TYPE_MAP.get(char)
+
+# Both cases of every type letter, unknown letters resolve to None
+_TYPE_MAP = {char: type_enum for type_enum in TextType for char in (type_enum.value, type_enum.value.lower())}
 
 #=============================================================================
 
@@ -29,56 +34,54 @@ class TextField:
     def __init__(self, name: str, type_chars: str):
         self.name = name
         self.type_chars = type_chars
-        self.types = []
-        self.total_space = []
-        self.has_negative = []
         self.full_spec = f"{name}:{type_chars}"
         self.type_widths = []
         self.total_width = 0
         
-        for char in type_chars:
-            data_type = TextType.from_char(char)
-            self.types.append(data_type)
-            self.total_space.append(0)
-            self.has_negative.append(False)
-
-#=============================================================================
-
-class TypeEntry:
-    def __init__(self):
-        self.offset = 0
-        self.length = 0
-        self.field_index = 0
-        self.type_index = 0
-        self.back_offset = 0
-        self.is_digit = False
-        self.value = ""
+        self.types = [_TYPE_MAP.get(char) for char in type_chars]
+        self.total_space = [0] * len(self.types)
+        self.has_negative = [False] * len(self.types)
 
 #=============================================================================
 
 class TextWriter:
     def __init__(self):
         self.fp = None
+        self.buffer = bytearray()
         self.fields = []
         self.block_name = ""
         self.line_count = 0
         self.current_line = 0
         self.current_field = 0
         self.num_fields = 0
-        self.type_entries = []
-        self.block_data = ""
+        self.type_values = []
     
     def open_file(self, filepath: str) -> None:
         try:
-            self.fp = open(filepath, 'w', encoding='utf-8')
+            self.fp = open(filepath, 'wb')
         except IOError:
             raise IOError(f"Unable to open {filepath} for saving")
+        self.buffer = bytearray()
     
     def close_file(self) -> None:
         if self.fp:
+            self.flush()
             self.fp.close()
             self.fp = None
     
+    def write(self, text: str) -> None:
+        if NEWLINE != "\n":
+            text = text.replace("\n", NEWLINE)
+        self.buffer += text.encode('utf-8')
+        
+        if len(self.buffer) >= WRITE_BUFFER_SIZE:
+            self.flush()
+    
+    def flush(self) -> None:
+        if self.buffer:
+            self.fp.write(self.buffer)
+            self.buffer.clear()
+    
     def __del__(self):
         if hasattr(self, 'fp') and self.fp:
             self.close_file()
@@ -89,9 +92,8 @@ class TextWriter:
         self.current_line = 0
         self.current_field = 0
         self.num_fields = 0
-        self.type_entries = []
+        self.type_values = []
         self.fields = []
-        self.block_data = ""
         
         if count < 0:
             self.block_name = f"[ {header_name} ]\n"
@@ -143,49 +145,20 @@ class TextWriter:
                 raise ValueError(f"Expected {len(field.types)} values for field {name}, got {len(field_values)}")
             
             for j, (value, data_type) in enumerate(zip(field_values, field.types)):
-                entry = TypeEntry()
-                entry.field_index = orig_current_field + i
-                entry.type_index = j
-                entry.back_offset = 0
-                
-                if data_type == TextType.INTEGER:
-                    entry.value = f"{value}"
-                    entry.is_digit = True
-                    if value < 0:
-                        field.has_negative[j] = True
-                elif data_type == TextType.FLOAT:
-                    if isinstance(value, (float, int)):
-                        entry.value = f"{float(value):.6f}"
-                    else:
-                        entry.value = f"{value}"
-                    entry.is_digit = True
-                    if float(value) < 0:
-                        field.has_negative[j] = True
-                elif data_type == TextType.STRING:
-                    entry.value = f'"{value}"'
-                    entry.is_digit = False
-                elif data_type == TextType.GUID:
-                    if isinstance(value, str):
-                        entry.value = f'"{value}"'
-                    else:
-                        high = (value >> 32) & 0xFFFFFFFF
-                        low = value & 0xFFFFFFFF
-                        entry.value = f'"{high:08X}:{low:08X}"'
-                    entry.is_digit = False
+                # Only the formatted text is kept per value, widths are tracked on the field
+                text, is_digit, is_negative = self._format_value(data_type, value)
+                if is_negative:
+                    field.has_negative[j] = True
                 
-                entry.length = len(entry.value)
-                entry.offset = len(self.block_data)
-                self.block_data += entry.value
+                base_width = len(text)
                 
-                base_width = entry.length
-                
-                if entry.is_digit and entry.value[0] != '-' and field.has_negative[j]:
+                if is_digit and text[0] != '-' and field.has_negative[j]:
                     base_width += 1               
                         
                 if field.total_space[j] < base_width:
                     field.total_space[j] = base_width
                 
-                self.type_entries.append(entry)
+                self.type_values.append(text)
         
         self.current_field += len(field_specs)
         
@@ -194,81 +167,160 @@ class TextWriter:
         self.current_field = 0
         
         if self.line_count == 0 or self.current_line == self.line_count:
-            self.fp.write(self.block_name)
+            num_types = sum(len(field.types) for field in self.fields)
+            values = self.type_values
+            self._write_block_data([values[i::num_types] for i in range(num_types)])
+    
+    def write_block(self, header_name: str, field_spec: str, rows) -> None:
+        
+        for row in rows:
+            if len(row) != len(rows[0]):
+                raise ValueError(f"Expected {len(rows[0])} values for field {field_spec}, got {len(row)}")
         
-            header_fields = []
-            separator_parts = []
+        self.write_columns(header_name, field_spec, list(zip(*rows)) if rows else [])
+    
+    def write_columns(self, header_name: str, field_spec: str, columns) -> None:
+        
+        line_count = len(columns[0]) if columns else 0
+        self.add_header(header_name, line_count)
+        if line_count == 0:
+            return
+        
+        for spec in field_spec.split():
+            if ":" not in spec:
+                raise ValueError(f"Field specification must include types (e.g. 'name:dfs'): {spec}")
+            name, type_chars = spec.split(":", 1)
+            self.fields.append(TextField(name, type_chars))
+        self.num_fields = len(self.fields)
+        
+        column_types = [(field, j, data_type) for field in self.fields for j, data_type in enumerate(field.types)]
+        if len(columns) != len(column_types):
+            raise ValueError(f"Expected {len(column_types)} values for field {field_spec}, got {len(columns)}")
+        
+        column_values = []
+        for (field, j, data_type), values in zip(column_types, columns):
+            if len(values) != line_count:
+                raise ValueError(f"Expected {line_count} lines for field {field.name}, got {len(values)}")
             
-            for field in self.fields:
-                type_widths = []
-                for i, type_size in enumerate(field.total_space):
-                    padded_width = max(type_size, 1)
-                    type_widths.append(padded_width)
-                
-                total_width = sum(type_widths) + len(type_widths) - 1
-                
-                header_len = len(field.full_spec)
-                if total_width < header_len:
-                    diff = header_len - total_width
-                    type_widths[-1] += diff
-                    total_width = header_len
-                
-                field.type_widths = type_widths
-                field.total_width = total_width
-                
-                header_fields.append(field.full_spec + " " * (total_width - header_len))
-                
-                separator_parts.append("-" * total_width)
+            texts, first_negative = self._format_column(data_type, values)
             
-            self.fp.write(f" {{ {' '.join(header_fields)} }}\n")
-            self.fp.write(f"// {' '.join(separator_parts)} \n")
+            # Widths grow the same way add_field does: the sign slot only counts once a negative was seen
+            width = max(map(len, texts[:first_negative]), default=0)
+            if first_negative is not None:
+                field.has_negative[j] = True
+                width = max(width, max(len(text) + (text[0] != '-') for text in texts[first_negative:]))
             
-            entry_index = 0
-            for line_idx in range(self.line_count):
-                self.fp.write("   ")
-                
-                for field_idx, field in enumerate(self.fields):
-                    field_str = ""
-                    current_width = 0
-                    
-                    for type_idx, type_width in enumerate(field.type_widths):
-                        entry = self.type_entries[entry_index]
-                        entry_index += 1
-                        
-                        prefix = ""
-                        if entry.is_digit and field.has_negative[type_idx] and entry.value[0] != '-':
-                            prefix = " "
-                        
-                        value_str = prefix + entry.value
-                        field_str += value_str
-                        current_width += len(value_str)
-                        
-                        if type_idx < len(field.type_widths) - 1:
-                            padding = type_width - len(value_str)
-                            if padding > 0:
-                                field_str += " " * padding
-                            current_width += padding + 1
-                            field_str += " " 
-                    
-                    if current_width < field.total_width:
-                        field_str += " " * (field.total_width - current_width)
-                    
-                    self.fp.write(field_str)
-                    
-                    if field_idx < len(self.fields) - 1:
-                        self.fp.write(" ")
-                
-                self.fp.write("\n")
+            field.total_space[j] = width
+            column_values.append(texts)
+        
+        self.current_line = self.line_count
+        self._write_block_data(column_values)
+    
+    @staticmethod
+    def _format_value(data_type: TextType, value) -> Tuple[str, bool, bool]:
+        if data_type == TextType.INTEGER:
+            return f"{value}", True, value < 0
+        elif data_type == TextType.FLOAT:
+            if isinstance(value, (float, int)):
+                text = f"{float(value):.6f}"
+            else:
+                text = f"{value}"
+            return text, True, float(value) < 0
+        elif data_type == TextType.STRING:
+            return f'"{value}"', False, False
+        elif data_type == TextType.GUID:
+            if isinstance(value, str):
+                return f'"{value}"', False, False
+            high = (value >> 32) & 0xFFFFFFFF
+            low = value & 0xFFFFFFFF
+            return f'"{high:08X}:{low:08X}"', False, False
+    
+    @classmethod
+    def _format_column(cls, data_type: TextType, values) -> Tuple[List[str], Optional[int]]:
+        # Formats a whole column with one C level map where the value types allow it
+        if data_type == TextType.INTEGER:
+            texts = list(map("{}".format, values))
+            has_negative = min(values) < 0
+        elif data_type == TextType.FLOAT and set(map(type, values)) <= {float, int}:
+            # One % over the whole column formats every value in C, the text is then cut back into cells
+            texts = ("\n".join(["%.6f"] * len(values)) % tuple(values)).split("\n")
+            has_negative = min(values) < 0
+        elif data_type == TextType.STRING:
+            return list(map('"{}"'.format, values)), None
+        else:
+            formatted = [cls._format_value(data_type, value) for value in values]
+            texts = [text for text, _, _ in formatted]
+            flags = [is_negative for _, _, is_negative in formatted]
+            return texts, flags.index(True) if True in flags else None
+        
+        if not has_negative:
+            return texts, None
+        return texts, next(i for i, value in enumerate(values) if value < 0)
+    
+    def _write_block_data(self, column_values: List[List[str]]) -> None:
+        out = [self.block_name]
+        
+        header_fields = []
+        separator_parts = []
+        
+        for field in self.fields:
+            type_widths = []
+            for i, type_size in enumerate(field.total_space):
+                padded_width = max(type_size, 1)
+                type_widths.append(padded_width)
+            
+            total_width = sum(type_widths) + len(type_widths) - 1
+            
+            header_len = len(field.full_spec)
+            if total_width < header_len:
+                diff = header_len - total_width
+                type_widths[-1] += diff
+                total_width = header_len
+            
+            field.type_widths = type_widths
+            field.total_width = total_width
+            
+            header_fields.append(field.full_spec + " " * (total_width - header_len))
+            
+            separator_parts.append("-" * total_width)
+        
+        separator = f"// {' '.join(separator_parts)} \n"
+        out.append(f" {{ {' '.join(header_fields)} }}\n")
+        out.append(separator)
+        
+        # Every value is left aligned in its type column, digits get a sign slot when the column has negatives
+        cells = []
+        cell_formats = []
+        column_index = 0
+        for field in self.fields:
+            for type_idx, (data_type, type_width) in enumerate(zip(field.types, field.type_widths)):
+                values = column_values[column_index]
+                column_index += 1
                 
-                if (line_idx + 1) % 80 == 0 and (self.line_count - line_idx) > 10:
-                    self.fp.write(f"// {' '.join(separator_parts)} \n")
+                if data_type in (TextType.INTEGER, TextType.FLOAT) and field.has_negative[type_idx]:
+                    values = [value if value[0] == '-' else " " + value for value in values]
+                cells.append(values)
+                cell_formats.append(f"%-{type_width}s")
+        
+        # One template per block, so each line is padded and joined by a single format call
+        row_template = f"   {' '.join(cell_formats)}\n"
+        lines = [row_template % line for line in zip(*cells)]
+        
+        repeated_header = None
+        for start in range(0, self.line_count, 80):
+            end = start + 80
+            out.extend(lines[start:end])
+            
+            if end < self.line_count and (self.line_count - end) >= 10:
+                if repeated_header is None:
                     headers = []
                     for field in self.fields:
                         header = field.full_spec + " " * (field.total_width - len(field.full_spec))
-                        headers.append(header)                
-                    self.fp.write(f"// {' '.join(headers)}\n")
-                    self.fp.write(f"// {' '.join(separator_parts)} \n")
-            
-            self.fp.write("\n")         
+                        headers.append(header)
+                    repeated_header = f"{separator}// {' '.join(headers)}\n{separator}"
+                out.append(repeated_header)
+        
+        out.append("\n")
+        self.write("".join(out))
             
 #=============================================================================            
\ No newline at end of file